@@ -1,33 +1,93 @@
 # pylint: disable=too-many-locals,broad-exception-caught,duplicate-code
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import multiprocessing
 import os
+import secrets
+import threading
 import webbrowser
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from contextlib import asynccontextmanager
-from typing import Annotated
-
-import pypdf
-from fastapi import FastAPI, HTTPException, Query
-from fastapi.responses import RedirectResponse
+from dataclasses import asdict
+from functools import partial
+from typing import Annotated, Any, Literal, TypeVar, get_args
+
+import pandas as pd
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, RedirectResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel
-
-from src.core.excel import (
-    discard_row_if_amount_missing,
-    format_date_column,
-    remap_categories,
-    sort_by_category,
-    standardize_columns,
+from pydantic import BaseModel, Field
+
+from src.core.categories import (
+    CATEGORIES_PATH,
+    CATEGORY_MEMO_PATH,
+    categorization_report,
+    enable_instrumentation,
+    get_category_memo,
+    reload_rules,
+    set_category_memo,
 )
+from src.core.excel import PipelinePlan, format_date_column
+from src.core.metrics import compute_metrics
 from src.io.actual import import_payslip_to_actual, import_transactions_to_actual
-from src.io.filesystem import decrypt_pdf, extract_payslip_data, read_excel, write_csv
+from src.io.cache import FileFingerprints, PayslipCache, StatementCache, hash_file
+from src.io.filesystem import (
+    extract_payslip_data,
+    load_cached_rules,
+    load_category_memo,
+    open_pdf,
+    preferred_engine,
+    read_excel,
+    read_payslip,
+    read_statement,
+    save_category_memo,
+    unlock_pdf,
+)
+from src.io.jobs import JobQueue, ProgressCallback
+from src.models.pdf import PayslipData
 
 
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
+    rules = reload_rules(load_cached_rules)
+    set_category_memo(load_category_memo(CATEGORY_MEMO_PATH, rules.digest))
+    if os.getenv("CATEGORIZATION_STATS"):
+        _ = enable_instrumentation()
     _ = webbrowser.open("http://localhost:8000/ui/index.html")
     yield
-    if os.path.exists("actual.csv"):
-        os.remove("actual.csv")
-
+    if PROCESS_POOL is not None:
+        PROCESS_POOL.shutdown(cancel_futures=True)
+    SYNC_JOBS.shutdown()
+    save_category_memo(get_category_memo(), CATEGORY_MEMO_PATH)
+
+
+SortColumn = Literal["Date", "Payee", "Amount", "Category"]
+SortOrder = Literal["asc", "desc"]
+MAX_PAGE_SIZE = 5000
+
+STATEMENT_PLAN = PipelinePlan(mode="memo", text_dtype="category")
+STATEMENT_CACHE = StatementCache()
+PAYSLIP_CACHE = PayslipCache()
+
+STATEMENT_PATH = "data.xlsx"
+PAYSLIP_PATH = "payslip.pdf"
+FINGERPRINTS = FileFingerprints()
+ETAG_SECRET = secrets.token_bytes(32)
+DATA_RESPONSES: OrderedDict[str, dict[str, Any]] = OrderedDict()
+DATA_RESPONSES_LOCK = threading.Lock()
+DATA_BUILDS: dict[str, asyncio.Future[dict[str, Any]]] = {}
+T = TypeVar("T")
+PROCESS_POOL: ProcessPoolExecutor | None = None
+PROCESS_POOL_LOCK = threading.Lock()
+SYNC_JOBS = JobQueue()
 
 app = FastAPI(title="Excel & Payslip Processor API", lifespan=lifespan)
 
@@ -46,147 +106,317 @@ def read_root():
     return RedirectResponse(url="/ui/index.html")
 
 
+def _load_statement(
+    file_path: str, read: Callable[..., pd.DataFrame] = read_excel
+) -> pd.DataFrame:
+    rules = reload_rules(load_cached_rules)
+    return read_statement(
+        file_path,
+        STATEMENT_PLAN,
+        engine=preferred_engine(file_path),
+        cache=STATEMENT_CACHE,
+        rules=rules,
+        read=read,
+    )
+
+
+def _password_tag(password: str) -> str:
+    """Keyed hash of a password, safe to use in keys without revealing it."""
+    return hmac.new(ETAG_SECRET, password.encode(), hashlib.sha256).hexdigest()
+
+
+def _data_etag(payslip_password: str | None) -> str:
+    """Strong validator over the input files and the effective payslip password."""
+    password = payslip_password if payslip_password is not None else os.getenv("PAYSLIP_PASSWORD", "")
+    digest = hashlib.sha256(_password_tag(password).encode())
+    for path in (STATEMENT_PATH, PAYSLIP_PATH, CATEGORIES_PATH):
+        digest.update(FINGERPRINTS.fingerprint(path).encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def _if_none_match(request: Request) -> set[str]:
+    header = request.headers.get("if-none-match", "")
+    return {tag.strip() for tag in header.split(",") if tag.strip()}
+
+
 @app.get("/api/data")
-def get_data(payslip_password: Annotated[str | None, Query()] = None):
+async def get_data(request: Request, payslip_password: Annotated[str | None, Query()] = None):
     """
     Auto-detect local files (data.xlsx and payslip.pdf).
     Process excel sheet, calculate summary metrics, and return them.
     If payslip.pdf is encrypted, decrypt with the provided password or environment password.
+    Responses carry an ETag over the inputs; a matching If-None-Match gets a 304.
+    The workbook is parsed and the payslip extracted concurrently in worker
+    processes; transactions are categorized in this process.
     """
-    excel_exists = os.path.exists("data.xlsx")
-    payslip_exists = os.path.exists("payslip.pdf")
-
-    excel_response = None
-    payslip_response = None
-
-    if excel_exists:
-        try:
-            df_raw = read_excel("data.xlsx", skiprows=3)
-            df = (
-                df_raw.pipe(standardize_columns)
-                .pipe(discard_row_if_amount_missing)
-                .pipe(format_date_column)
-                .pipe(remap_categories)
-                .pipe(sort_by_category)
-            )
-
-            # Outflows (Amount > 0)
-            total_spent = float(df[df["Amount"] > 0]["Amount"].sum()) if not df.empty else 0.0
-            avg_trans = float(df["Amount"].mean()) if not df.empty else 0.0
-            trans_count = int(len(df))
-
-            spent_by_cat = df[df["Amount"] > 0].groupby("Category")["Amount"].sum()
-            if not spent_by_cat.empty:
-                top_cat = str(spent_by_cat.idxmax())
-                top_cat_amt = float(spent_by_cat.max())
-            else:
-                top_cat = "N/A"
-                top_cat_amt = 0.0
-
-            transactions = df.to_dict(orient="records")
-
-            excel_response = {
-                "exists": True,
-                "metrics": {
-                    "total_spent": total_spent,
-                    "avg_trans": avg_trans,
-                    "trans_count": trans_count,
-                    "top_category": top_cat,
-                    "top_category_amount": top_cat_amt,
-                },
-                "transactions": transactions
-            }
-        except Exception as e:
-            excel_response = {
-                "exists": True,
-                "error": f"Failed to process Excel file: {str(e)}"
-            }
-
-    if payslip_exists:
-        try:
-            reader = pypdf.PdfReader("payslip.pdf")
-            requires_password = reader.is_encrypted
-
-            payslip_data = None
-            error_message = None
-
-            env_pwd = os.getenv("PAYSLIP_PASSWORD")
-            password = payslip_password if payslip_password is not None else (env_pwd if env_pwd is not None else "")
-
-            if requires_password and not password:
-                # Password required but not supplied yet
-                pass
-            else:
-                try:
-                    if requires_password:
-                        decrypt_pdf("payslip.pdf", password)
-                    extracted = extract_payslip_data("payslip.pdf")
-                    payslip_data = {
-                        "date": extracted.date.isoformat(),
-                        "taxable_income": extracted.taxable_income,
-                        "net_to_bank": extracted.net_to_bank
-                    }
-                except Exception as ex:
-                    error_message = f"Decryption failed: {str(ex)}"
-
-            payslip_response = {
-                "exists": True,
-                "requires_password": requires_password,
-                "data": payslip_data,
-                "error": error_message
-            }
-        except Exception as e:
-            payslip_response = {
-                "exists": True,
-                "error": f"Failed to read PDF file: {str(e)}"
-            }
+    etag = await run_in_threadpool(_data_etag, payslip_password)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in _if_none_match(request) or "*" in _if_none_match(request):
+        return Response(status_code=304, headers=headers)
 
-    return {
+    with DATA_RESPONSES_LOCK:
+        body = DATA_RESPONSES.get(etag)
+    if body is None:
+        body = await _build_data_once(etag, payslip_password)
+    if not _succeeded(body):
+        # Errors may be transient, so they are neither cached nor validated
+        return JSONResponse(body, headers={"Cache-Control": "no-store"})
+    return JSONResponse(body, headers=headers)
+
+
+def _succeeded(body: dict[str, Any]) -> bool:
+    return not any(section is not None and section.get("error") for section in body.values())
+
+
+def _process_pool() -> ProcessPoolExecutor:
+    global PROCESS_POOL  # pylint: disable=global-statement
+    with PROCESS_POOL_LOCK:
+        if PROCESS_POOL is None:
+            PROCESS_POOL = ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn"))
+        return PROCESS_POOL
+
+
+def _discard_pool(broken: ProcessPoolExecutor) -> None:
+    global PROCESS_POOL  # pylint: disable=global-statement
+    with PROCESS_POOL_LOCK:
+        if PROCESS_POOL is broken:
+            PROCESS_POOL = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _in_pool(function: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run function in the worker pool and wait for it.
+    A worker that died breaks the whole pool, so the pool is rebuilt and the
+    call retried once before the error is raised.
+    """
+    pool = _process_pool()
+    try:
+        return pool.submit(function, *args, **kwargs).result()
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        return _process_pool().submit(function, *args, **kwargs).result()
+
+
+async def _build_data_once(etag: str, payslip_password: str | None) -> dict[str, Any]:
+    """Concurrent requests for the same inputs share a single build."""
+    build = DATA_BUILDS.get(etag)
+    if build is None or build.get_loop() is not asyncio.get_running_loop():
+        build = asyncio.ensure_future(_build_data(payslip_password))
+        DATA_BUILDS[etag] = build
+        build.add_done_callback(lambda _: DATA_BUILDS.pop(etag, None))
+
+    body = await asyncio.shield(build)
+    if _succeeded(body):
+        with DATA_RESPONSES_LOCK:
+            DATA_RESPONSES[etag] = body
+            while len(DATA_RESPONSES) > 8:
+                _ = DATA_RESPONSES.popitem(last=False)
+    return body
+
+
+async def _build_data(payslip_password: str | None) -> dict[str, Any]:
+    # Only parsing runs in worker processes; categorization and the payslip
+    # cache stay here, where the memo, the counters and cached fields live
+    excel_response, payslip_response = await asyncio.gather(
+        run_in_threadpool(_excel_data, STATEMENT_PATH, partial(_in_pool, read_excel)),
+        run_in_threadpool(_payslip_data, PAYSLIP_PATH, payslip_password, partial(_in_pool, read_payslip)),
+    )
+    return jsonable_encoder({
         "excel": excel_response,
         "payslip": payslip_response
+    })
+
+
+def _excel_data(
+    file_path: str, read: Callable[..., pd.DataFrame] = read_excel
+) -> dict[str, Any] | None:
+    if not os.path.exists(file_path):
+        return None
+
+    try:
+        df = _load_statement(file_path, read)
+        return {
+            "exists": True,
+            "metrics": compute_metrics(df),
+        }
+    except Exception as e:
+        return {
+            "exists": True,
+            "error": f"Failed to process Excel file: {str(e)}"
+        }
+
+
+def _payslip_data(
+    file_path: str,
+    payslip_password: str | None,
+    read: Callable[..., tuple[bool, PayslipData | None, str | None]] = read_payslip,
+) -> dict[str, Any] | None:
+    if not os.path.exists(file_path):
+        return None
+
+    env_pwd = os.getenv("PAYSLIP_PASSWORD")
+    password = payslip_password if payslip_password is not None else (env_pwd if env_pwd is not None else "")
+
+    try:
+        # Cached fields answer repeat requests for the same bytes without pypdf
+        digest = hash_file(file_path)
+        requires_password = PAYSLIP_CACHE.encrypted(digest)
+        extracted = PAYSLIP_CACHE.get(digest, password)
+        error_message = None
+        # A known encrypted payslip without a password has nothing to read yet
+        if extracted is None and not (requires_password and not password):
+            requires_password, extracted, error_message = read(file_path, password)
+            if extracted is not None:
+                PAYSLIP_CACHE.put(digest, extracted, password if requires_password else None)
+    except Exception as e:
+        return {
+            "exists": True,
+            "error": f"Failed to read PDF file: {str(e)}"
+        }
+
+    return {
+        "exists": True,
+        "requires_password": requires_password,
+        "data": {**asdict(extracted), "date": extracted.date.isoformat()} if extracted is not None else None,
+        "error": f"Decryption failed: {error_message}" if error_message else None
     }
 
 
-@app.post("/api/sync/transactions")
-def sync_transactions():
-    """Process local data.xlsx to CSV and import transactions to Actual Budget."""
-    if not os.path.exists("data.xlsx"):
-        raise HTTPException(status_code=404, detail="data.xlsx not found")
+def _encode_cursor(offset: int, limit: int, sort: str, order: str) -> str:
+    payload = json.dumps({"offset": offset, "limit": limit, "sort": sort, "order": order})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
 
+def _decode_cursor(cursor: str) -> tuple[int, int, SortColumn, SortOrder]:
     try:
-        df_raw = read_excel("data.xlsx", skiprows=3)
-        df = (
-            df_raw.pipe(standardize_columns)
-            .pipe(discard_row_if_amount_missing)
-            .pipe(format_date_column)
-            .pipe(remap_categories)
-            .pipe(sort_by_category)
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        offset, limit = int(payload["offset"]), int(payload["limit"])
+        sort, order = payload["sort"], payload["order"]
+    except (ValueError, KeyError, TypeError) as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
+    # Cursors come back from clients, so they get the same bounds as the query
+    if offset < 0 or not 1 <= limit <= MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return offset, limit, sort, order
+
+
+def _ndjson_chunks(dataframe: pd.DataFrame, chunk_size: int = 1000) -> Iterator[str]:
+    for start in range(0, len(dataframe), chunk_size):
+        chunk = format_date_column(dataframe.iloc[start:start + chunk_size])
+        yield chunk.to_json(orient="records", lines=True, force_ascii=False)
+
+
+class TransactionsQuery(BaseModel):
+    """Query parameters for paging through the processed transactions."""
+    offset: int = Field(0, ge=0)
+    limit: int | None = Field(None, ge=1, le=MAX_PAGE_SIZE)
+    sort: SortColumn = "Category"
+    order: SortOrder = "asc"
+    cursor: str | None = None
+    response_format: Literal["json", "ndjson"] = Field("json", alias="format")
+
+
+@app.get("/api/transactions")
+def get_transactions(query: Annotated[TransactionsQuery, Query()]):
+    """
+    Page through the processed transactions of data.xlsx.
+    Sorted server-side by the requested column; a cursor from a previous page
+    replaces offset, sort and order and carries the page size. format=ndjson streams the remaining rows
+    as newline-delimited JSON while they are serialized.
+    """
+    if not os.path.exists(STATEMENT_PATH):
+        raise HTTPException(status_code=404, detail="data.xlsx not found")
+    offset, limit, sort, order = query.offset, query.limit, query.sort, query.order
+    if query.cursor is not None:
+        offset, cursor_limit, sort, order = _decode_cursor(query.cursor)
+        limit = limit or cursor_limit
+    if sort not in get_args(SortColumn) or order not in get_args(SortOrder):
+        raise HTTPException(status_code=400, detail="Invalid sort")
+
+    df = _load_statement(STATEMENT_PATH).sort_values(by=[sort], ascending=order == "asc", kind="stable")
+
+    if query.response_format == "ndjson":
+        end = offset + limit if limit is not None else len(df)
+        return StreamingResponse(
+            _ndjson_chunks(df.iloc[offset:end]), media_type="application/x-ndjson"
         )
-        csv_path = "actual.csv"
-        write_csv(df, csv_path)
-        import_transactions_to_actual(csv_path)
-        return {"status": "success", "message": "Successfully synchronized transactions to Actual Budget"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Synchronization failed: {str(e)}") from e
 
+    limit = limit or 500
+    page = df.iloc[offset:offset + limit]
+    next_offset = offset + len(page)
+    return {
+        "total": int(len(df)),
+        "offset": offset,
+        "limit": limit,
+        "next_cursor": _encode_cursor(next_offset, limit, sort, order) if next_offset < len(df) else None,
+        "items": format_date_column(page).to_dict(orient="records"),
+    }
+
+
+@app.get("/api/stats/categories")
+def get_category_stats():
+    """
+    Report rule hit counts, unused rules and stage timings.
+    Instrumentation is opt-in via the CATEGORIZATION_STATS environment variable.
+    """
+    return {
+        **categorization_report(),
+        "memo": get_category_memo().stats(),
+    }
+
+
+@app.post("/api/sync/transactions", status_code=202)
+def sync_transactions():
+    """
+    Queue an import of data.xlsx into Actual Budget and return the job.
+    Resubmitting the same workbook while its import is pending returns the pending job.
+    """
+    if not os.path.exists(STATEMENT_PATH):
+        raise HTTPException(status_code=404, detail="data.xlsx not found")
+
+    def run(progress: ProgressCallback) -> str:
+        progress("load", 0, 1)
+        df = _load_statement(STATEMENT_PATH)
+        progress("load", 1, 1)
+        import_transactions_to_actual(df, progress)
+        return "Successfully synchronized transactions to Actual Budget"
+
+    return SYNC_JOBS.submit("transactions", hash_file(STATEMENT_PATH), run)
 
-@app.post("/api/sync/payslip")
+
+@app.post("/api/sync/payslip", status_code=202)
 def sync_payslip(request: PayslipSyncRequest):
-    """Decrypt the local payslip.pdf and import salary to Actual Budget."""
-    if not os.path.exists("payslip.pdf"):
+    """
+    Queue decrypting the local payslip.pdf and importing the salary to Actual Budget.
+    Unreadable PDFs and missing or wrong passwords are reported by the job.
+    """
+    if not os.path.exists(PAYSLIP_PATH):
         raise HTTPException(status_code=404, detail="payslip.pdf not found")
 
-    password = request.password or os.getenv("PAYSLIP_PASSWORD", "")
+    password: str = request.password or os.getenv("PAYSLIP_PASSWORD") or ""
 
-    try:
-        reader = pypdf.PdfReader("payslip.pdf")
+    def run(progress: ProgressCallback) -> str:
+        progress("load", 0, 1)
+        reader = open_pdf(PAYSLIP_PATH)
         if reader.is_encrypted:
             if not password:
-                raise HTTPException(status_code=400, detail="Password required for encrypted payslip")
-            decrypt_pdf("payslip.pdf", password)
-
-        payslip_data = extract_payslip_data("payslip.pdf")
-        import_payslip_to_actual(payslip_data)
-        return {"status": "success", "message": "Successfully synchronized payslip to Actual Budget"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Synchronization failed: {str(e)}") from e
+                raise ValueError("Password required for encrypted payslip")
+            unlock_pdf(reader, password)
+        payslip_data = extract_payslip_data(reader)
+        progress("load", 1, 1)
+        import_payslip_to_actual(payslip_data, progress)
+        return "Successfully synchronized payslip to Actual Budget"
+
+    # A pending job only absorbs resubmissions that carry the same password
+    key = f"{hash_file(PAYSLIP_PATH)}:{_password_tag(password)}"
+    return SYNC_JOBS.submit("payslip", key, run)
+
+
+@app.get("/api/jobs/{job_id}")
+def get_job(job_id: str):
+    """Status and per-stage progress of a sync job."""
+    job = SYNC_JOBS.status(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
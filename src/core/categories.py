@@ -1,46 +1,112 @@
+import os
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Sequence
+from functools import partial
+from typing import Any, cast
+
+import numpy as np
 import pandas as pd
-import yaml
+
+from src.core.instrumentation import CategorizationStats
+from src.core.matcher import Match
+from src.core.memo import CategoryMemo, MemoKey
+from src.core.rules import RuleSet, parse_categories
 
 CATEGORIES_PATH = "src/core/categories.yaml"
+CATEGORY_MEMO_PATH = "src/core/categories.memo.pkl"
+DEFAULT_CATEGORY = "Misc & One-offs"
+
+REIMBURSABLE_CATEGORY = "Reimburseable"
+REIMBURSABLE_KEYWORDS = ["work expenses", "shared bills"]
+
+RENT_CATEGORY = "Home & Decor"
+RENT_KEYWORDS = ["paybox"]
+RENT_AMOUNT_RANGES = [(2900, 3100), (800, 900)]
 
 
 def load_categories() -> dict[str, list[str]]:
     try:
-        with open(CATEGORIES_PATH, "r", encoding="utf-8") as f:
-            loaded = yaml.safe_load(f)
-            if isinstance(loaded, dict):
-                return loaded
-    except (OSError, yaml.YAMLError):
-        pass
-    return {}
+        with open(CATEGORIES_PATH, "rb") as f:
+            return parse_categories(f.read())
+    except OSError:
+        return {}
+
+
+def load_rules(path: str = CATEGORIES_PATH) -> RuleSet:
+    """Compile the rule set for categories.yaml; a missing file gives no rules."""
+    try:
+        with open(path, "rb") as f:
+            return RuleSet.from_yaml(f.read())
+    except OSError:
+        return RuleSet.compile({}, "")
+
+
+def _categories_mtime() -> float:
+    try:
+        return os.stat(CATEGORIES_PATH).st_mtime
+    except OSError:
+        return 0.0
+
 
+# Rules are loaded on first use, so callers can install a precompiled set first.
+# These are mutable module state rebound through `global`, not constants.
+# pylint: disable=invalid-name
+_rules_lock = threading.RLock()
+_rules_mtime: float = 0.0
+_rules: RuleSet | None = None
+_memo: CategoryMemo = CategoryMemo("")
+_stats: CategorizationStats | None = None
+# pylint: enable=invalid-name
 
-_categories: dict[str, list[str]] = load_categories()
+
+def get_rules() -> RuleSet:
+    rules = _rules
+    return rules if rules is not None else reload_rules()
+
+
+def reload_rules(loader: Callable[[], RuleSet] = load_rules) -> RuleSet:
+    """Swap in freshly compiled rules if categories.yaml changed on disk."""
+    global _rules, _rules_mtime  # pylint: disable=global-statement
+    mtime = _categories_mtime()
+    rules = _rules
+    if rules is not None and mtime == _rules_mtime:
+        return rules
+
+    with _rules_lock:
+        rules = _rules
+        if rules is None or mtime != _rules_mtime:
+            loaded = loader()
+            if rules is None or loaded.digest != rules.digest:
+                rules = loaded
+                _rules = rules
+                _memo.validate(rules.digest)
+            _rules_mtime = mtime
+        return rules
 
 
 def check_reimbursable(row: pd.Series) -> str | None:
     name = row["Payee"].lower()
     amount = row["Amount"]
-    keywords = ["work expenses", "shared bills"]
-    if amount < 0 or any(x in name for x in keywords):
-        return "Reimburseable"
+    if amount < 0 or any(x in name for x in REIMBURSABLE_KEYWORDS):
+        return REIMBURSABLE_CATEGORY
     return None
 
 
 def check_rent(row: pd.Series) -> str | None:
     name = row["Payee"].lower()
     amount = row["Amount"]
-    keywords = ["paybox"]
-    if any(x in name for x in keywords):
-        if 2900 <= amount <= 3100 or 800 <= amount <= 900:
-            return "Home & Decor"
+    if any(x in name for x in RENT_KEYWORDS):
+        if any(low <= amount <= high for low, high in RENT_AMOUNT_RANGES):
+            return RENT_CATEGORY
     return None
 
 
 def check_keywords(row: pd.Series, category: str) -> str | None:
     name = row["Payee"].lower()
     cat = row["Category"]
-    keywords = _categories.get(category, [])
+    keywords = get_rules().categories.get(category, [])
     for keyword in keywords:
         if keyword.startswith("e:"):
             if name == keyword[2:]:
@@ -50,7 +116,39 @@ def check_keywords(row: pd.Series, category: str) -> str | None:
     return None
 
 
-def map_category(row: pd.Series) -> str:
+def find_keyword_rule(
+    row: pd.Series, rules: RuleSet | None = None
+) -> tuple[str, str] | None:
+    """The (category, keyword) check_keywords would match first, in one automaton scan."""
+    rules = rules or get_rules()
+    name = row["Payee"].lower()
+    cat = row["Category"]
+    candidates = []
+    match = rules.matcher.search(name)
+    if match:
+        candidates.append(match)
+    exact = rules.exact_index.get(name)
+    if exact is not None:
+        candidates.append((exact, f"e:{name}"))
+    bank = rules.bank_index.get(cat)
+    if bank is not None:
+        candidates.append((bank, cat))
+
+    if not candidates:
+        return None
+    priority, keyword = min(candidates)
+    return rules.names[priority], keyword
+
+
+def match_keywords(row: pd.Series, rules: RuleSet | None = None) -> str | None:
+    found = find_keyword_rule(row, rules)
+    return found[0] if found else None
+
+
+def map_category(row: pd.Series, rules: RuleSet | None = None) -> str:
+    if _stats is not None:
+        return _map_category_instrumented(row, rules, _stats)
+
     res = check_reimbursable(row)
     if res:
         return res
@@ -59,9 +157,289 @@ def map_category(row: pd.Series) -> str:
     if res:
         return res
 
-    for category in _categories:
-        res = check_keywords(row, category)
+    res = match_keywords(row, rules)
+    if res:
+        return res
+
+    return DEFAULT_CATEGORY
+
+
+def _map_category_instrumented(
+    row: pd.Series, rules: RuleSet | None, stats: CategorizationStats
+) -> str:
+    for stage, check in (
+        ("check_reimbursable", check_reimbursable),
+        ("check_rent", check_rent),
+    ):
+        start = time.perf_counter()
+        res = check(row)
+        stats.record_stage(stage, time.perf_counter() - start)
         if res:
+            stats.record_hit(res)
             return res
 
-    return "Misc & One-offs"
+    start = time.perf_counter()
+    found = find_keyword_rule(row, rules)
+    stats.record_stage("check_keywords", time.perf_counter() - start)
+    if found:
+        stats.record_hit(*found)
+        return found[0]
+
+    stats.record_fallthroughs()
+    return DEFAULT_CATEGORY
+
+
+def enable_instrumentation() -> CategorizationStats:
+    """Start collecting per-rule hit counts and stage timings."""
+    global _stats  # pylint: disable=global-statement
+    if _stats is None:
+        _stats = CategorizationStats()
+    return _stats
+
+
+def disable_instrumentation() -> None:
+    global _stats  # pylint: disable=global-statement
+    _stats = None
+
+
+def get_stats() -> CategorizationStats | None:
+    return _stats
+
+
+def categorization_report() -> dict[str, object]:
+    if _stats is None:
+        return {"enabled": False}
+    return {"enabled": True, **_stats.to_dict(get_rules().categories)}
+
+
+def amount_bucket(amount: float) -> int:
+    """Collapse an amount to the ranges the reimbursable and rent rules tell apart."""
+    if amount < 0:
+        return 0
+    if any(low <= amount <= high for low, high in RENT_AMOUNT_RANGES):
+        return 1
+    return 2
+
+
+def memo_key(payee: str, category: object, amount: float) -> MemoKey:
+    bank_category = category if isinstance(category, str) else None
+    return (payee.lower(), bank_category, amount_bucket(amount))
+
+
+def get_category_memo() -> CategoryMemo:
+    return _memo
+
+
+def set_category_memo(memo: CategoryMemo) -> None:
+    """Install a memo, e.g. one restored from disk, discarding it if the rules changed."""
+    global _memo  # pylint: disable=global-statement
+    with _rules_lock:
+        memo.validate(get_rules().digest)
+        _memo = memo
+
+
+def _validated_memo() -> tuple[RuleSet, CategoryMemo]:
+    # Rules and memo are read together so the memo always matches the rules used
+    with _rules_lock:
+        rules = get_rules()
+        memo = _memo
+        memo.validate(rules.digest)
+    return rules, memo
+
+
+def map_category_cached(row: pd.Series) -> str:
+    rules, memo = _validated_memo()
+    if _stats is not None:
+        return map_category(row, rules)
+    key = memo_key(row["Payee"], row["Category"], row["Amount"])
+    return memo.get_or_compute(key, lambda: map_category(row, rules))
+
+
+def _map_values(payee: Any, category: Any, amount: Any, rules: RuleSet) -> str:
+    return map_category(
+        pd.Series({"Payee": payee, "Amount": amount, "Category": category}), rules
+    )
+
+
+def map_categories_cached(dataframe: pd.DataFrame) -> pd.Series:
+    """Row-wise categorization through the memo; rows are only built on a miss."""
+    rules, memo = _validated_memo()
+    rows = zip(dataframe["Payee"], dataframe["Category"], dataframe["Amount"])
+    # Memo hits never reach the rules, so instrumented runs evaluate every row
+    if _stats is not None:
+        results = [_map_values(payee, category, amount, rules) for payee, category, amount in rows]
+    else:
+        results = [
+            memo.get_or_compute(
+                memo_key(payee, category, amount),
+                partial(_map_values, payee, category, amount, rules),
+            )
+            for payee, category, amount in rows
+        ]
+    return pd.Series(results, index=dataframe.index, name="Category", dtype=object)
+
+
+def amount_buckets(amounts: pd.Series) -> np.ndarray:
+    """Columnar amount_bucket; NaN amounts fall in the catch-all bucket."""
+    in_range = np.zeros(len(amounts), dtype=bool)
+    for low, high in RENT_AMOUNT_RANGES:
+        in_range |= amounts.between(low, high).to_numpy(dtype=bool)
+    negative = (amounts < 0).to_numpy(dtype=bool)
+    return np.select([negative, in_range], [0, 1], default=2)
+
+
+def lower_payees(payees: pd.Series) -> pd.Series:
+    """Lowercase the payee column, once per category when it is categorical."""
+    if not isinstance(payees.dtype, pd.CategoricalDtype):
+        return payees.str.lower()
+
+    lowered = pd.Index(payees.cat.categories).str.lower()
+    category_codes, uniques = pd.factorize(lowered)
+    codes = payees.cat.codes.to_numpy()
+    new_codes = np.where(codes >= 0, category_codes.take(codes), -1)
+    # from_codes accepts any integer array; the stubs only declare Sequence[int]
+    return pd.Series(
+        pd.Categorical.from_codes(cast(Sequence[int], new_codes), uniques),
+        index=payees.index,
+    )
+
+
+def _key_codes(values: pd.Series) -> np.ndarray:
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy()
+    return pd.factorize(values)[0]
+
+
+def map_categories_distinct(
+    dataframe: pd.DataFrame, rules: RuleSet | None = None
+) -> pd.Series:
+    """Categorize each distinct (payee, bank category, amount bucket) once."""
+    if _stats is not None:
+        return map_categories(dataframe, rules)
+    keys = pd.DataFrame(
+        {
+            "Payee": _key_codes(lower_payees(dataframe["Payee"])),
+            "Category": _key_codes(dataframe["Category"]),
+            "Bucket": amount_buckets(dataframe["Amount"]),
+        }
+    )
+    groups = keys.groupby(list(keys.columns), dropna=False, sort=False).ngroup()
+    codes: np.ndarray = groups.to_numpy()
+    _, first_rows = np.unique(codes, return_index=True)
+
+    distinct = map_categories(dataframe.iloc[first_rows], rules).to_numpy()
+    return pd.Series(distinct.take(codes), index=dataframe.index, name="Category")
+
+
+def _contains_any(names: pd.Series, keywords: list[str]) -> pd.Series:
+    mask = pd.Series(False, index=names.index)
+    for keyword in keywords:
+        mask |= names.str.contains(keyword, regex=False, na=False)
+    return mask
+
+
+def reimbursable_mask(dataframe: pd.DataFrame) -> pd.Series:
+    names = lower_payees(dataframe["Payee"])
+    amounts = dataframe["Amount"]
+    return (amounts < 0) | _contains_any(names, REIMBURSABLE_KEYWORDS)
+
+
+def rent_mask(dataframe: pd.DataFrame) -> pd.Series:
+    names = lower_payees(dataframe["Payee"])
+    amounts = dataframe["Amount"]
+    in_range = pd.Series(False, index=dataframe.index)
+    for low, high in RENT_AMOUNT_RANGES:
+        in_range |= amounts.between(low, high)
+    return _contains_any(names, RENT_KEYWORDS) & in_range
+
+
+def _keyword_indexes(
+    dataframe: pd.DataFrame, rules: RuleSet
+) -> list[tuple[pd.Series, dict[Any, Match]]]:
+    names = lower_payees(dataframe["Payee"])
+    substring: dict[Any, Match] = {}
+    for name in names.dropna().unique():
+        match = rules.matcher.search(name)
+        if match:
+            substring[name] = match
+    exact = {name: (priority, f"e:{name}") for name, priority in rules.exact_index.items()}
+    bank = {cat: (priority, cat) for cat, priority in rules.bank_index.items()}
+    return [(names, substring), (names, exact), (dataframe["Category"], bank)]
+
+
+def keyword_priorities(
+    dataframe: pd.DataFrame, rules: RuleSet
+) -> tuple[np.ndarray, np.ndarray]:
+    """Best keyword-rule priority and keyword per row; len(categories) and None when nothing matches."""
+    best = np.full(len(dataframe), np.inf)
+    keywords = np.full(len(dataframe), None, dtype=object)
+    for values, index in _keyword_indexes(dataframe, rules):
+        candidate = values.map({value: m[0] for value, m in index.items()}).to_numpy(dtype=float)
+        candidate_keywords = values.map({value: m[1] for value, m in index.items()}).to_numpy(dtype=object)
+        better = candidate < best
+        # Ties go to the smaller keyword, as min() does in find_keyword_rule
+        for row in np.flatnonzero(candidate == best):
+            better[row] = candidate_keywords[row] < keywords[row]
+        best = np.where(better, candidate, best)
+        keywords[better] = candidate_keywords[better]
+    return np.where(np.isinf(best), len(rules.names), best).astype(int), keywords
+
+
+def map_categories(
+    dataframe: pd.DataFrame, rules: RuleSet | None = None
+) -> pd.Series:
+    """Columnar counterpart of map_category."""
+    rules = rules or get_rules()
+    result = np.full(len(dataframe), DEFAULT_CATEGORY, dtype=object)
+    unresolved = np.ones(len(dataframe), dtype=bool)
+
+    stats = _stats
+    start = time.perf_counter()
+
+    for stage, category, build_mask in [
+        ("check_reimbursable", REIMBURSABLE_CATEGORY, reimbursable_mask),
+        ("check_rent", RENT_CATEGORY, rent_mask),
+    ]:
+        hit = build_mask(dataframe).to_numpy(dtype=bool, na_value=False) & unresolved
+        result[hit] = category
+        unresolved &= ~hit
+        if stats is not None:
+            start = _record_vectorized_stage(stats, stage, start, len(dataframe))
+
+    keyword_hit = np.zeros(len(dataframe), dtype=bool)
+    keywords = np.full(len(dataframe), None, dtype=object)
+    if unresolved.any():
+        priorities, keywords = keyword_priorities(dataframe, rules)
+        keyword_hit = unresolved & (priorities < len(rules.names))
+        result[keyword_hit] = np.asarray(rules.names, dtype=object)[priorities[keyword_hit]]
+        unresolved &= ~keyword_hit
+        if stats is not None:
+            _ = _record_vectorized_stage(stats, "check_keywords", start, len(dataframe))
+
+    if stats is not None:
+        _record_vectorized_hits(stats, result, keywords, keyword_hit, unresolved)
+    return pd.Series(result, index=dataframe.index, name="Category")
+
+
+def _record_vectorized_hits(
+    stats: CategorizationStats,
+    result: np.ndarray,
+    keywords: np.ndarray,
+    keyword_hit: np.ndarray,
+    unresolved: np.ndarray,
+) -> None:
+    for category, count in Counter(result[~unresolved & ~keyword_hit]).items():
+        stats.record_hit(category, count=count)
+    for (category, keyword), count in Counter(
+        zip(result[keyword_hit], keywords[keyword_hit])
+    ).items():
+        stats.record_hit(category, keyword, count=count)
+    stats.record_fallthroughs(int(unresolved.sum()))
+
+
+def _record_vectorized_stage(
+    stats: CategorizationStats, stage: str, start: float, rows: int
+) -> float:
+    now = time.perf_counter()
+    stats.record_stage(stage, now - start, calls=rows)
+    return now
@@ -1,17 +1,35 @@
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
 import pandas as pd
+from pandas.api.types import union_categoricals
+
+from src.core.categories import (
+    map_categories,
+    map_categories_cached,
+    map_categories_distinct,
+    map_category,
+)
+from src.core.rules import RuleSet
 
-from src.core.categories import map_category
+CategorizeMode = Literal["row", "vectorized", "memo", "dedup"]
+TextDtype = Literal["object", "category", "string[pyarrow]"]
+
+COLUMN_MAPPING = {
+    "תאריך\nעסקה": "Date",
+    "שם בית עסק": "Payee",
+    "סכום\nחיוב": "Amount",
+    "ענף": "Category",
+}
+SOURCE_COLUMNS = {target: source for source, target in COLUMN_MAPPING.items()}
+# Statements store dates as Excel date cells or as day-first text
+STATEMENT_DATE_FORMAT = "%d/%m/%Y"
 
 
 def standardize_columns(dataframe: pd.DataFrame) -> pd.DataFrame:
     new_df = dataframe.copy()
-    column_mapping = {
-        "תאריך\nעסקה": "Date",
-        "שם בית עסק": "Payee",
-        "סכום\nחיוב": "Amount",
-        "ענף": "Category",
-    }
-    return new_df[list(column_mapping.keys())].rename(columns=column_mapping)
+    return new_df[list(COLUMN_MAPPING.keys())].rename(columns=COLUMN_MAPPING)
 
 
 def discard_row_if_amount_missing(
@@ -30,11 +48,42 @@ def sort_by_category(
     return new_df.sort_values(by=[column_name])
 
 
+def _categorize(
+    dataframe: pd.DataFrame, mode: CategorizeMode, rules: RuleSet | None = None
+) -> pd.Series:
+    if mode == "row":
+        return dataframe.apply(map_category, axis=1, rules=rules)
+    if mode == "vectorized":
+        return map_categories(dataframe, rules)
+    if mode == "memo":
+        # The memo is tied to the installed rules, see set_category_memo
+        return map_categories_cached(dataframe)
+    if mode == "dedup":
+        return map_categories_distinct(dataframe, rules)
+    raise ValueError(f"Unknown categorization mode: {mode}")
+
+
 def remap_categories(
+    dataframe: pd.DataFrame, mode: CategorizeMode = "vectorized"
+) -> pd.DataFrame:
+    new_df = dataframe.copy()
+    if new_df.empty:
+        return new_df
+    new_df["Category"] = _categorize(new_df, mode)
+    return new_df
+
+
+def parse_date_column(
     dataframe: pd.DataFrame,
+    column_name: str = "Date",
+    date_format: str | None = STATEMENT_DATE_FORMAT,
 ) -> pd.DataFrame:
+    """Parse the date column to datetime64, caching repeated values."""
     new_df = dataframe.copy()
-    new_df["Category"] = new_df.apply(map_category, axis=1)
+    if column_name in new_df.columns:
+        new_df[column_name] = pd.to_datetime(
+            new_df[column_name], format=date_format, cache=True
+        )
     return new_df
 
 
@@ -47,3 +96,91 @@ def format_date_column(
             date_format
         )
     return new_df
+
+
+@dataclass(frozen=True)
+class PipelinePlan:  # pylint: disable=too-many-instance-attributes
+    """Lazy description of the statement pipeline; nothing runs until execute()."""
+
+    columns: dict[str, str] = field(default_factory=lambda: dict(COLUMN_MAPPING))
+    dtypes: dict[str, str] = field(
+        default_factory=lambda: {SOURCE_COLUMNS["Amount"]: "float64"}
+    )
+    text_columns: tuple[str, ...] = (SOURCE_COLUMNS["Payee"], SOURCE_COLUMNS["Category"])
+    text_dtype: TextDtype = "object"
+    required: str = SOURCE_COLUMNS["Amount"]
+    mode: CategorizeMode = "vectorized"
+    date_format: str | None = STATEMENT_DATE_FORMAT
+    sort_by: str = "Category"
+
+    def read_options(self) -> dict[str, Any]:
+        text_dtypes = {column: self.text_dtype for column in self.text_columns}
+        return {
+            "usecols": list(self.columns),
+            "dtype": {**self.dtypes, **text_dtypes},
+            "required": [self.required],
+        }
+
+    def execute(
+        self, dataframe: pd.DataFrame, rules: RuleSet | None = None
+    ) -> pd.DataFrame:
+        """Run the plan on a raw or reader-projected sheet."""
+        new_df = self.execute_batch(dataframe, rules)
+        new_df.sort_values(by=[self.sort_by], inplace=True)
+        return new_df
+
+    def execute_batch(
+        self, dataframe: pd.DataFrame, rules: RuleSet | None = None
+    ) -> pd.DataFrame:
+        """Run every stage except the sort, which needs the whole statement."""
+        keep = dataframe[self.required].notna().to_numpy()
+        new_df = dataframe.loc[keep, list(self.columns)]
+        for column in self.text_columns:
+            if new_df[column].dtype != self.text_dtype:
+                new_df[column] = new_df[column].astype(self.text_dtype)
+        new_df.columns = pd.Index(self.columns.values())
+
+        new_df["Date"] = pd.to_datetime(
+            new_df["Date"], format=self.date_format, cache=True
+        )
+        if not new_df.empty:
+            categorized = _categorize(new_df, self.mode, rules)
+            new_df["Category"] = categorized.astype(self.text_dtype)
+        return new_df
+
+    def execute_batches(
+        self, batches: Iterable[pd.DataFrame], rules: RuleSet | None = None
+    ) -> Iterator[pd.DataFrame]:
+        for batch in batches:
+            yield self.execute_batch(batch, rules)
+
+
+def concat_batches(
+    batches: Iterable[pd.DataFrame], ignore_index: bool = False
+) -> pd.DataFrame:
+    """Concatenate pipeline outputs, keeping categorical columns categorical."""
+    frames = list(batches)
+    columns = frames[0].columns if frames else pd.Index([])
+    shared = {
+        column: union_categoricals(
+            [frame[column] for frame in frames], sort_categories=True
+        ).categories
+        for column in columns
+        if all(isinstance(frame[column].dtype, pd.CategoricalDtype) for frame in frames)
+    }
+    if shared:
+        for i, frame in enumerate(frames):
+            new_df = frame.copy(deep=False)
+            for column, categories in shared.items():
+                new_df[column] = new_df[column].cat.set_categories(categories)
+            frames[i] = new_df
+    return pd.concat(frames, ignore_index=ignore_index)
+
+
+def run_pipeline(
+    dataframe: pd.DataFrame,
+    mode: CategorizeMode = "vectorized",
+    date_format: str | None = STATEMENT_DATE_FORMAT,
+) -> pd.DataFrame:
+    """Fused standardize -> discard -> parse date -> remap -> sort pipeline."""
+    return PipelinePlan(mode=mode, date_format=date_format).execute(dataframe)
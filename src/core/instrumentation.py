@@ -0,0 +1,50 @@
+import threading
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+
+
+@dataclass
+class CategorizationStats:
+    """Counters and timings collected while categorization instrumentation is on."""
+
+    category_hits: Counter[str] = field(default_factory=Counter)
+    keyword_hits: Counter[str] = field(default_factory=Counter)
+    fallthroughs: int = 0
+    stage_seconds: defaultdict[str, float] = field(default_factory=lambda: defaultdict(float))
+    stage_calls: Counter[str] = field(default_factory=Counter)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record_stage(self, stage: str, seconds: float, calls: int = 1) -> None:
+        with self._lock:
+            self.stage_seconds[stage] += seconds
+            self.stage_calls[stage] += calls
+
+    def record_hit(self, category: str, keyword: str | None = None, count: int = 1) -> None:
+        with self._lock:
+            self.category_hits[category] += count
+            if keyword is not None:
+                self.keyword_hits[keyword] += count
+
+    def record_fallthroughs(self, count: int = 1) -> None:
+        with self._lock:
+            self.fallthroughs += count
+
+    def to_dict(self, categories: dict[str, list[str]]) -> dict[str, object]:
+        keywords = [keyword for values in categories.values() for keyword in values]
+        with self._lock:
+            # Nothing categorized yet says nothing about which rules are dead
+            counted = bool(self.category_hits) or self.fallthroughs > 0
+            return {
+                "category_hits": dict(self.category_hits.most_common()),
+                "keyword_hits": dict(self.keyword_hits.most_common()),
+                "fallthroughs": self.fallthroughs,
+                "unused_categories": [c for c in categories if not self.category_hits[c]] if counted else None,
+                "unused_keywords": [k for k in keywords if not self.keyword_hits[k]] if counted else None,
+                "stages": {
+                    stage: {
+                        "calls": self.stage_calls[stage],
+                        "seconds": self.stage_seconds[stage],
+                    }
+                    for stage in self.stage_seconds
+                },
+            }
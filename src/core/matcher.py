@@ -0,0 +1,72 @@
+from collections import deque
+from collections.abc import Iterable
+
+Match = tuple[int, str]
+
+
+# RuleSet builds the goto/fail tables once per rules file and reuses them for every search
+class KeywordMatcher:  # pylint: disable=too-few-public-methods
+    """
+    Aho-Corasick automaton over prioritized keywords.
+    Scans a text in a single pass and returns the matching keyword with the
+    lowest priority value, as a (priority, keyword) pair.
+    """
+
+    def __init__(self, keywords: Iterable[tuple[str, int]]) -> None:
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._best: list[Match | None] = [None]
+        for keyword, priority in keywords:
+            self._add(keyword, priority)
+        self._build()
+
+    def _add(self, keyword: str, priority: int) -> None:
+        node = 0
+        for char in keyword:
+            child = self._goto[node].get(char)
+            if child is None:
+                child = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._best.append(None)
+                self._goto[node][char] = child
+            node = child
+        self._best[node] = _better(self._best[node], (priority, keyword))
+
+    def _build(self) -> None:
+        queue = deque(self._goto[0].values())
+        for child in queue:
+            self._best[child] = _better(self._best[child], self._best[0])
+
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._best[child] = _better(
+                    self._best[child], self._best[self._fail[child]]
+                )
+
+    def search(self, text: str) -> Match | None:
+        goto, fail, outputs = self._goto, self._fail, self._best
+        node = 0
+        best = outputs[0]
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            best = _better(best, outputs[node])
+            if best is not None and best[0] == 0:
+                break
+        return best
+
+
+def _better(current: Match | None, candidate: Match | None) -> Match | None:
+    if candidate is None:
+        return current
+    if current is None or candidate[0] < current[0]:
+        return candidate
+    return current
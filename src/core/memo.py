@@ -0,0 +1,82 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+
+MemoKey = tuple[str, str | None, int]
+
+
+class CategoryMemo:
+    """
+    Bounded LRU memo of categorization results.
+    Entries are only valid for the rule set they were computed with, so the
+    memo is tied to the content hash of categories.yaml and cleared on change.
+    The memo is shared between request and job threads, so every access to the
+    entries holds a lock; compute runs outside it.
+    """
+
+    def __init__(self, rules_hash: str, maxsize: int = 4096) -> None:
+        self.rules_hash: str = rules_hash
+        self.maxsize: int = maxsize
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: OrderedDict[MemoKey, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get_or_compute(self, key: MemoKey, compute: Callable[[], str]) -> str:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return value
+            self.misses += 1
+
+        value = compute()
+        with self._lock:
+            self._store(key, value)
+        return value
+
+    def validate(self, rules_hash: str) -> None:
+        with self._lock:
+            if rules_hash != self.rules_hash:
+                self._clear()
+                self.rules_hash = rules_hash
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clear()
+
+    def entries(self) -> list[tuple[MemoKey, str]]:
+        with self._lock:
+            return list(self._entries.items())
+
+    def update(self, entries: Iterable[tuple[MemoKey, str]]) -> None:
+        with self._lock:
+            for key, value in entries:
+                self._store(key, value)
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def _store(self, key: MemoKey, value: str) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            _ = self._entries.popitem(last=False)
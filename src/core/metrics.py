@@ -0,0 +1,104 @@
+from collections.abc import Callable
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+Aggregate = Callable[["MetricFrame"], object]
+
+_registry: dict[str, Aggregate] = {}
+
+
+def metric(name: str) -> Callable[[Aggregate], Aggregate]:
+    """Register an aggregate under name; it receives the shared MetricFrame."""
+
+    def register(aggregate: Aggregate) -> Aggregate:
+        _registry[name] = aggregate
+        return aggregate
+
+    return register
+
+
+class MetricFrame:
+    """
+    Columns and group sums shared by every registered aggregate.
+    The outflow mask and each breakdown are computed at most once, as a
+    bincount over factorized codes, no matter how many metrics read them.
+    """
+
+    def __init__(self, dataframe: pd.DataFrame) -> None:
+        self.dataframe: pd.DataFrame = dataframe
+        self.amounts: np.ndarray = dataframe["Amount"].to_numpy(dtype=float)
+        self.outflow: np.ndarray = self.amounts > 0
+
+    @cached_property
+    def spent_by_category(self) -> pd.Series:
+        return self.outflow_by(self.dataframe["Category"])
+
+    @cached_property
+    def spent_by_month(self) -> pd.Series:
+        months = pd.to_datetime(self.dataframe["Date"]).dt.strftime("%Y-%m")
+        return self.outflow_by(months)
+
+    @cached_property
+    def spent_by_payee(self) -> pd.Series:
+        return self.outflow_by(self.dataframe["Payee"])
+
+    def outflow_by(self, keys: pd.Series) -> pd.Series:
+        """Sum of outflows per key, for keys with at least one outflow, sorted by key."""
+        codes, uniques = pd.factorize(keys, sort=True)
+        valid = self.outflow & (codes >= 0)
+        sums = np.bincount(codes[valid], weights=self.amounts[valid], minlength=len(uniques))
+        counts = np.bincount(codes[valid], minlength=len(uniques))
+        present = counts > 0
+        return pd.Series(sums[present], index=pd.Index(uniques)[present])
+
+
+def compute_metrics(
+    dataframe: pd.DataFrame, names: list[str] | None = None
+) -> dict[str, object]:
+    frame = MetricFrame(dataframe)
+    return {name: _registry[name](frame) for name in names or list(_registry)}
+
+
+@metric("total_spent")
+def total_spent(frame: MetricFrame) -> float:
+    return float(frame.amounts[frame.outflow].sum())
+
+
+@metric("avg_trans")
+def avg_trans(frame: MetricFrame) -> float:
+    return float(frame.amounts.mean()) if len(frame.amounts) else 0.0
+
+
+@metric("trans_count")
+def trans_count(frame: MetricFrame) -> int:
+    return int(len(frame.amounts))
+
+
+@metric("top_category")
+def top_category(frame: MetricFrame) -> str:
+    spent = frame.spent_by_category
+    return str(spent.idxmax()) if not spent.empty else "N/A"
+
+
+@metric("top_category_amount")
+def top_category_amount(frame: MetricFrame) -> float:
+    spent = frame.spent_by_category
+    return float(spent.max()) if not spent.empty else 0.0
+
+
+@metric("spent_by_category")
+def spent_by_category(frame: MetricFrame) -> dict[str, float]:
+    return {str(k): float(v) for k, v in frame.spent_by_category.items()}
+
+
+@metric("spent_by_month")
+def spent_by_month(frame: MetricFrame) -> dict[str, float]:
+    return {str(k): float(v) for k, v in frame.spent_by_month.items()}
+
+
+@metric("top_payees")
+def top_payees(frame: MetricFrame, count: int = 5) -> dict[str, float]:
+    spent = frame.spent_by_payee.sort_values(ascending=False, kind="stable")
+    return {str(k): float(v) for k, v in spent.head(count).items()}
@@ -1,13 +1,14 @@
+import hashlib
 import re
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
 from datetime import date
+from typing import Any
 
 
-def extract_payslip_date(text: str) -> date:
-    match = re.search(r"תלוש משכורת לחודש\n(\d{2}/\d{4})", text)
-    if not match:
-        raise ValueError("Could not find payslip date")
-
-    month, year = map(int, match.group(1).split("/"))
+def parse_payslip_month(value: str) -> date:
+    # The payslip month is paid on the 1st of the following month
+    month, year = map(int, value.split("/"))
     if month == 12:
         next_month = 1
         next_year = year + 1
@@ -17,15 +18,125 @@ def extract_payslip_date(text: str) -> date:
     return date(next_year, next_month, 1)
 
 
+def parse_amount(value: str) -> float:
+    return float(value.replace(",", ""))
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    """A payslip field: a pattern with one capture group and a parser for it."""
+
+    name: str
+    pattern: str
+    parser: Callable[[str], Any]
+    required: bool = True
+
+
+PAYSLIP_FIELD_SPECS: tuple[FieldSpec, ...] = (
+    FieldSpec("date", r"תלוש משכורת לחודש\n(\d{2}/\d{4})", parse_payslip_month),
+    FieldSpec("taxable_income", r"([\d,.]+)\nהכנסה חייבת", parse_amount),
+    FieldSpec("net_to_bank", r"נטו לבנק([\d,.]+)", parse_amount),
+    FieldSpec("income_tax", r"מס הכנסה ?([\d,.]+)", parse_amount, required=False),
+    FieldSpec("national_insurance", r"ביטוח לאומי ?([\d,.]+)", parse_amount, required=False),
+    FieldSpec("pension", r"פנסיה ?([\d,.]+)", parse_amount, required=False),
+    FieldSpec("overtime", r"שעות נוספות ?([\d,.]+)", parse_amount, required=False),
+)
+
+
+def spec_version(specs: Iterable[FieldSpec]) -> str:
+    """Fingerprint of what the specs extract, to tell stale cached fields apart."""
+    described = [
+        (spec.name, spec.pattern, f"{spec.parser.__module__}.{spec.parser.__qualname__}", spec.required)
+        for spec in specs
+    ]
+    return hashlib.sha256(repr(described).encode()).hexdigest()[:16]
+
+
+# Compiles the combined lookahead regex once at import, for every payslip page scanned
+class FieldScanner:  # pylint: disable=too-few-public-methods
+    """
+    All field patterns compiled into one regex, scanned over the text once.
+    Each pattern sits in its own lookahead, so a match marks a position where
+    some field starts; every pending field is tried there, which keeps fields
+    whose labels start at the same place from shadowing each other. The first
+    parseable match of each field wins, like a per-field re.search.
+    """
+
+    def __init__(self, specs: Iterable[FieldSpec]) -> None:
+        self.specs: dict[str, FieldSpec] = {spec.name: spec for spec in specs}
+        self._patterns = {name: re.compile(spec.pattern) for name, spec in self.specs.items()}
+        self._combined = re.compile(
+            "|".join(f"(?=(?P<{name}>{spec.pattern}))" for name, spec in self.specs.items())
+        )
+
+    def scan(self, text: str, names: Iterable[str] | None = None) -> dict[str, Any]:
+        requested = None if names is None else set(names)
+        pending = [name for name in self.specs if requested is None or name in requested]
+        found: dict[str, Any] = {}
+        for match in self._combined.finditer(text):
+            for name in pending:
+                value = self._patterns[name].match(text, match.start())
+                if value is None:
+                    continue
+                try:
+                    found[name] = self.specs[name].parser(value.group(1))
+                except ValueError:
+                    continue
+            pending = [name for name in pending if name not in found]
+            if not pending:
+                break
+        return found
+
+
+PAYSLIP_SCANNER = FieldScanner(PAYSLIP_FIELD_SPECS)
+PAYSLIP_SPEC_VERSION = spec_version(PAYSLIP_FIELD_SPECS)
+PAYSLIP_FIELDS: tuple[str, ...] = tuple(spec.name for spec in PAYSLIP_FIELD_SPECS)
+REQUIRED_PAYSLIP_FIELDS: tuple[str, ...] = tuple(
+    spec.name for spec in PAYSLIP_FIELD_SPECS if spec.required
+)
+
+
+def find_fields(text: str, names: Iterable[str]) -> dict[str, Any]:
+    return PAYSLIP_SCANNER.scan(text, names)
+
+
+def _find_field(text: str, name: str, error: str) -> Any:
+    found = find_fields(text, [name])
+    if name not in found:
+        raise ValueError(error)
+    return found[name]
+
+
+def extract_payslip_date(text: str) -> date:
+    return _find_field(text, "date", "Could not find payslip date")
+
+
 def extract_gross_pay(text: str) -> float:
-    match = re.search(r"([\d,.]+)\nהכנסה חייבת", text)
-    if match:
-        return float(match.group(1).replace(",", ""))
-    raise ValueError("Could not find gross income")
+    return _find_field(text, "taxable_income", "Could not find gross income")
 
 
 def extract_net_pay(text: str) -> float:
-    match = re.search(r"נטו לבנק([\d,.]+)", text)
-    if match:
-        return float(match.group(1).replace(",", ""))
-    raise ValueError("Could not find net income")
+    return _find_field(text, "net_to_bank", "Could not find net income")
+
+
+class PayslipLayout:
+    """
+    Pages the payslip fields were found on in earlier payslips, and the fields
+    a scan of every page did not find. Extraction visits the known pages first
+    and falls back to the rest in order.
+    """
+
+    def __init__(self) -> None:
+        self.pages: dict[str, int] = {}
+        self.absent: set[str] = set()
+
+    def page_order(self, page_count: int) -> list[int]:
+        hinted = sorted({page for page in self.pages.values() if page < page_count})
+        return hinted + [page for page in range(page_count) if page not in hinted]
+
+    def learn(self, pages: dict[str, int], absent: Iterable[str] = ()) -> None:
+        self.pages.update(pages)
+        self.absent.difference_update(pages)
+        for name in absent:
+            self.absent.add(name)
+            _ = self.pages.pop(name, None)
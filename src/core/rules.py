@@ -0,0 +1,71 @@
+import hashlib
+from dataclasses import dataclass
+
+import yaml
+
+from src.core.matcher import KeywordMatcher
+
+
+def compile_keyword_matcher(categories: dict[str, list[str]]) -> KeywordMatcher:
+    """Compile the substring keywords, prioritized by category order in the YAML."""
+    return KeywordMatcher(
+        (keyword, priority)
+        for priority, keywords in enumerate(categories.values())
+        for keyword in keywords
+        if not keyword.startswith("e:")
+    )
+
+
+def compile_equality_indexes(
+    categories: dict[str, list[str]],
+) -> tuple[dict[str, int], dict[str, int]]:
+    """Build the payee and bank-category lookups for the equality rules."""
+    exact_index: dict[str, int] = {}
+    bank_index: dict[str, int] = {}
+    for priority, keywords in enumerate(categories.values()):
+        for keyword in keywords:
+            if keyword.startswith("e:"):
+                _ = exact_index.setdefault(keyword[2:], priority)
+            else:
+                _ = bank_index.setdefault(keyword, priority)
+    return exact_index, bank_index
+
+
+def parse_categories(content: bytes) -> dict[str, list[str]]:
+    try:
+        loaded = yaml.safe_load(content)
+    except yaml.YAMLError:
+        return {}
+    return loaded if isinstance(loaded, dict) else {}
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    """Category rules compiled from categories.yaml into their matching structures."""
+
+    categories: dict[str, list[str]]
+    names: list[str]
+    matcher: KeywordMatcher
+    exact_index: dict[str, int]
+    bank_index: dict[str, int]
+    digest: str
+
+    @classmethod
+    def compile(cls, categories: dict[str, list[str]], digest: str) -> "RuleSet":
+        exact_index, bank_index = compile_equality_indexes(categories)
+        return cls(
+            categories=categories,
+            names=list(categories),
+            matcher=compile_keyword_matcher(categories),
+            exact_index=exact_index,
+            bank_index=bank_index,
+            digest=digest,
+        )
+
+    @classmethod
+    def from_yaml(cls, content: bytes) -> "RuleSet":
+        return cls.compile(parse_categories(content), hash_content(content))
+
+
+def hash_content(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
@@ -0,0 +1,34 @@
+import argparse
+import sys
+
+from src.core.excel import PipelinePlan
+from src.io.batch import expand_statement_paths, ingest_statements
+from src.io.filesystem import write_csv
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Process several statements in parallel")
+    parser.add_argument("patterns", nargs="+", help="Statement directories or globs")
+    parser.add_argument("--output", default="statements.csv", help="CSV or Parquet output path")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes")
+    args = parser.parse_args()
+
+    file_paths = [path for pattern in args.patterns for path in expand_statement_paths(pattern)]
+    if not file_paths:
+        print("Error: No .xlsx statements matched.")
+        sys.exit(1)
+
+    print(f"Processing {len(file_paths)} statements...")
+    dataframe = ingest_statements(
+        file_paths, PipelinePlan(mode="dedup"), max_workers=args.workers
+    )
+
+    if args.output.endswith(".parquet"):
+        dataframe.to_parquet(args.output)
+    else:
+        write_csv(dataframe, args.output)
+    print(f"Wrote {len(dataframe)} transactions to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
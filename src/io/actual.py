@@ -1,7 +1,7 @@
-import csv
 import os
-from datetime import date, datetime
+from datetime import date
 
+import pandas as pd
 from actual import Actual
 from actual.queries import (
     create_transaction,
@@ -10,10 +10,17 @@ from actual.queries import (
 )
 from dotenv import load_dotenv
 
+from src.io.jobs import ProgressCallback
 from src.models.pdf import PayslipData
 
 
-def import_payslip_to_actual(payslip_data: PayslipData) -> None:
+def _no_progress(_stage: str, _done: int, _total: int) -> None:
+    pass
+
+
+def import_payslip_to_actual(
+    payslip_data: PayslipData, progress: ProgressCallback = _no_progress
+) -> None:
     _ = load_dotenv()
 
     server_url = os.getenv("ACTUAL_SERVER_URL")
@@ -26,7 +33,9 @@ def import_payslip_to_actual(payslip_data: PayslipData) -> None:
     with Actual(base_url=server_url, password=password) as actual:
         print(f"Connecting to budget: {budget_id}")
         _ = actual.set_file(budget_id)
+        progress("download", 0, 1)
         _ = actual.download_budget()
+        progress("download", 1, 1)
         session = actual.session
 
         accounts = get_accounts(session)
@@ -51,6 +60,7 @@ def import_payslip_to_actual(payslip_data: PayslipData) -> None:
         month_name = salary_date.strftime("%B")
         description = f"Salary for {month_name}"
 
+        progress("import", 0, 1)
         _ = create_transaction(
             session,
             date=trans_date,
@@ -60,14 +70,21 @@ def import_payslip_to_actual(payslip_data: PayslipData) -> None:
             amount=payslip_data.net_to_bank,
             notes=description,
         )
+        progress("import", 1, 1)
 
         print("Committing changes...")
+        progress("commit", 0, 1)
         actual.commit()
+        progress("commit", 1, 1)
+        progress("sync", 0, 1)
         _ = actual.sync()
+        progress("sync", 1, 1)
         print("Done.")
 
 
-def import_transactions_to_actual(csv_path: str) -> None:
+def import_transactions_to_actual(
+    dataframe: pd.DataFrame, progress: ProgressCallback = _no_progress
+) -> None:
     _ = load_dotenv()
 
     server_url = os.getenv("ACTUAL_SERVER_URL")
@@ -80,7 +97,9 @@ def import_transactions_to_actual(csv_path: str) -> None:
     with Actual(base_url=server_url, password=password) as actual:
         print(f"Connecting to budget: {budget_id}")
         _ = actual.set_file(budget_id)
+        progress("download", 0, 1)
         _ = actual.download_budget()
+        progress("download", 1, 1)
         session = actual.session
 
         # Get Account
@@ -94,47 +113,52 @@ def import_transactions_to_actual(csv_path: str) -> None:
 
         affected_months: set[int] = set()
 
-        # Read CSV
-        print(f"Reading {csv_path}...")
+        # Dates arrive as datetime64 and are only converted to date here
+        print(f"Importing {len(dataframe)} rows...")
         count = 0
-        with open(csv_path, "r", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                date_str = row.get("Date")
-                payee = row.get("Payee")
-                amount_str = row.get("Amount")
-                category_name = row.get("Category")
-
-                if not date_str or not amount_str:
-                    continue
-
-                date_obj = datetime.strptime(date_str, "%Y-%m-%d").date()
-                amount_float = float(amount_str)
-
-                # Invert sign: CSV (Positive=Expense) -> Actual (Negative=Expense)
-                actual_amount = amount_float * -1
-
-                category = cat_map.get(category_name) if category_name else None
-
-                _ = create_transaction(
-                    session,
-                    date=date_obj,
-                    account=account,
-                    payee=payee,
-                    category=category,
-                    amount=actual_amount,
-                    notes="Imported via script",
-                )
-
-                affected_months.add(int(date_obj.strftime("%Y%m")))
-                count += 1
+        total = len(dataframe)
+        progress("import", 0, total)
+        rows = zip(
+            pd.to_datetime(dataframe["Date"]).dt.date,
+            dataframe["Payee"],
+            dataframe["Amount"],
+            dataframe["Category"],
+        )
+        for position, (date_obj, payee, amount, category_name) in enumerate(rows, start=1):
+            if position % 100 == 0:
+                progress("import", position, total)
+            if pd.isna(date_obj) or pd.isna(amount):
+                continue
+
+            # Invert sign: Statement (Positive=Expense) -> Actual (Negative=Expense)
+            actual_amount = float(amount) * -1
+
+            category = cat_map.get(category_name) if isinstance(category_name, str) else None
+
+            _ = create_transaction(
+                session,
+                date=date_obj,
+                account=account,
+                payee=payee if isinstance(payee, str) else "",
+                category=category,
+                amount=actual_amount,
+                notes="Imported via script",
+            )
+
+            affected_months.add(date_obj.year * 100 + date_obj.month)
+            count += 1
+        progress("import", total, total)
 
         if count > 0:
             print(f"Imported {count} transactions.")
 
             print("Committing changes...")
+            progress("commit", 0, 1)
             actual.commit()
+            progress("commit", 1, 1)
+            progress("sync", 0, 1)
             _ = actual.sync()
+            progress("sync", 1, 1)
             print("Done.")
         else:
             print("No transactions found to import.")
@@ -0,0 +1,131 @@
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field, fields
+from itertools import repeat
+
+import pandas as pd
+
+from src.core.categories import reload_rules
+from src.core.excel import PipelinePlan, concat_batches
+from src.io.filesystem import (
+    ExcelEngine,
+    load_cached_rules,
+    load_payslip,
+    preferred_engine,
+    read_statement,
+)
+from src.models.pdf import PayslipData
+
+
+def _expand_paths(pattern: str, directory_glob: str) -> list[str]:
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, directory_glob)
+    return sorted(glob.glob(os.path.expanduser(pattern)))
+
+
+def expand_statement_paths(pattern: str) -> list[str]:
+    """Resolve a directory or glob to the statement workbooks it names."""
+    return _expand_paths(pattern, "*.xlsx")
+
+
+def expand_payslip_paths(pattern: str) -> list[str]:
+    """Resolve a directory or glob to the payslip PDFs it names."""
+    return _expand_paths(pattern, "*.pdf")
+
+
+def _process_statement(
+    file_path: str, plan: PipelinePlan, engine: ExcelEngine, skiprows: int
+) -> pd.DataFrame:
+    rules = reload_rules(load_cached_rules)
+    dataframe = read_statement(file_path, plan, skiprows=skiprows, engine=engine, rules=rules)
+    dataframe["Source"] = os.path.splitext(os.path.basename(file_path))[0]
+    dataframe["File"] = os.path.abspath(file_path)
+    return dataframe
+
+
+def ingest_statements(
+    file_paths: list[str],
+    plan: PipelinePlan | None = None,
+    engine: ExcelEngine | None = None,
+    skiprows: int = 3,
+    max_workers: int | None = None,
+) -> pd.DataFrame:
+    """
+    Parse and categorize several statements in parallel, one per process.
+    The results are merged into one frame sorted like a single statement, with
+    Source (statement name) and File (absolute path) provenance columns.
+    """
+    plan = plan or PipelinePlan()
+    if not file_paths:
+        return pd.DataFrame(columns=[*plan.columns.values(), "Source", "File"])
+    engine = engine or preferred_engine(file_paths[0])
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        frames = list(
+            pool.map(
+                _process_statement,
+                file_paths,
+                repeat(plan),
+                repeat(engine),
+                repeat(skiprows),
+            )
+        )
+
+    merged = concat_batches(frames, ignore_index=True)
+    return merged.sort_values(by=[plan.sort_by], kind="stable", ignore_index=True)
+
+
+@dataclass
+class PayslipBatch:
+    """Payslips extracted from several files, ordered by pay date, plus the files that failed."""
+
+    payslips: list[PayslipData] = field(default_factory=list)
+    files: list[str] = field(default_factory=list)
+    failures: dict[str, str] = field(default_factory=dict)
+
+    def to_frame(self) -> pd.DataFrame:
+        columns = [*(f.name for f in fields(PayslipData)), "File"]
+        rows = [{**asdict(p), "File": f} for p, f in zip(self.payslips, self.files)]
+        history = pd.DataFrame(rows, columns=columns)
+        history["date"] = pd.to_datetime(history["date"])
+        return history
+
+
+def _process_payslip(
+    file_path: str, password: str | None
+) -> tuple[PayslipData | None, str | None]:
+    try:
+        return load_payslip(file_path, password), None
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        return None, f"{type(e).__name__}: {e}"
+
+
+def process_payslips(
+    file_paths: list[str],
+    password: str | None = None,
+    max_workers: int | None = None,
+) -> PayslipBatch:
+    """
+    Decrypt and extract several payslips in parallel, one per process.
+    A file that cannot be read or parsed is recorded in failures instead of
+    aborting the batch.
+    """
+    batch = PayslipBatch()
+    if not file_paths:
+        return batch
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        results = list(pool.map(_process_payslip, file_paths, repeat(password)))
+
+    extracted: list[tuple[PayslipData, str]] = []
+    for file_path, (payslip, error) in zip(file_paths, results):
+        if payslip is None:
+            batch.failures[file_path] = error or "Unknown error"
+        else:
+            extracted.append((payslip, os.path.abspath(file_path)))
+
+    extracted.sort(key=lambda item: item[0].date)
+    batch.payslips = [payslip for payslip, _ in extracted]
+    batch.files = [file_path for _, file_path in extracted]
+    return batch
@@ -0,0 +1,249 @@
+import contextlib
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import threading
+from collections import OrderedDict
+from dataclasses import asdict
+from datetime import date
+from typing import Any
+
+import pandas as pd
+
+from src.core.pdf import PAYSLIP_SPEC_VERSION
+from src.models.pdf import PayslipData
+
+STATEMENT_CACHE_DIR = ".cache/statements"
+PAYSLIP_CACHE_DIR = ".cache/payslips"
+
+logger = logging.getLogger(__name__)
+
+
+def hash_file(file_path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class StatementCache:
+    """
+    Content-addressed store of processed statements as Parquet files.
+    Entries are keyed by the workbook hash and everything else that shapes the
+    processed frame; the least recently used files are evicted once the
+    directory grows past max_bytes.
+    """
+
+    def __init__(self, directory: str = STATEMENT_CACHE_DIR, max_bytes: int = 256 << 20) -> None:
+        self.directory: str = directory
+        self.max_bytes: int = max_bytes
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(file_path: str, *parts: str) -> str:
+        digest = hashlib.sha256(hash_file(file_path).encode())
+        for part in parts:
+            digest.update(b"\0" + part.encode())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> pd.DataFrame | None:
+        path = self._path(key)
+        try:
+            dataframe = pd.read_parquet(path)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return dataframe
+
+    def put(self, key: str, dataframe: pd.DataFrame) -> None:
+        """Store the frame; a failed write is logged and leaves the cache unchanged."""
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            dataframe.to_parquet(tmp_path)
+            os.replace(tmp_path, path)
+            self._evict()
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.warning("Could not cache statement %s: %s", key, e)
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+
+    def clear(self) -> None:
+        for entry in self._entries():
+            os.remove(entry.path)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.parquet")
+
+    def _entries(self) -> list[os.DirEntry[str]]:
+        try:
+            with os.scandir(self.directory) as entries:
+                return [e for e in entries if e.name.endswith(".parquet")]
+        except OSError:
+            return []
+
+    def _evict(self) -> None:
+        with self._lock:
+            entries = sorted(self._entries(), key=lambda e: e.stat().st_mtime)
+            total = sum(e.stat().st_size for e in entries)
+            while entries and total > self.max_bytes:
+                oldest = entries.pop(0)
+                total -= oldest.stat().st_size
+                os.remove(oldest.path)
+
+
+# One instance per process keeps the known hashes and their lock shared by every request
+class FileFingerprints:  # pylint: disable=too-few-public-methods
+    """
+    Content hashes of files, recomputed only when their mtime or size changes.
+    A fingerprint of an unchanged file costs a single stat call.
+    """
+
+    def __init__(self) -> None:
+        self._known: dict[str, tuple[int, int, str]] = {}
+        self._lock = threading.Lock()
+
+    def fingerprint(self, file_path: str) -> str:
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return "missing"
+
+        with self._lock:
+            known = self._known.get(file_path)
+        if known and known[:2] == (stat.st_mtime_ns, stat.st_size):
+            digest = known[2]
+        else:
+            digest = hash_file(file_path)
+            with self._lock:
+                self._known[file_path] = (stat.st_mtime_ns, stat.st_size, digest)
+        return f"{stat.st_mtime_ns}:{stat.st_size}:{digest}"
+
+
+class PayslipCache:
+    """
+    Extracted payslip fields keyed by the hash of the (encrypted) PDF bytes.
+    Entries live in memory and as small JSON files. Only the fields are stored:
+    for an encrypted PDF the entry holds a salted PBKDF2 verifier of the
+    password, never the password or any decrypted content, and a lookup only
+    succeeds when the caller supplies the same password. Entries written under
+    another version of the field specs are misses.
+    """
+
+    def __init__(
+        self,
+        directory: str = PAYSLIP_CACHE_DIR,
+        max_entries: int = 128,
+        iterations: int = 10_000,
+        version: str = PAYSLIP_SPEC_VERSION,
+    ) -> None:
+        self.directory: str = directory
+        self.max_entries: int = max_entries
+        self.iterations: int = iterations
+        self.version: str = version
+        self._entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def encrypted(self, digest: str) -> bool | None:
+        """Whether the cached PDF is encrypted, or None when it is not cached."""
+        entry = self._entry(digest)
+        return bool(entry["encrypted"]) if entry is not None else None
+
+    def get(self, digest: str, password: str | None = None) -> PayslipData | None:
+        entry = self._entry(digest)
+        if entry is None:
+            return None
+        if entry["encrypted"]:
+            if not password:
+                return None
+            expected = self._verifier(password, bytes.fromhex(entry["salt"]))
+            if not hmac.compare_digest(expected, entry["verifier"]):
+                return None
+
+        fields = dict(entry["fields"])
+        fields["date"] = date.fromisoformat(fields["date"])
+        return PayslipData(**fields)
+
+    def put(self, digest: str, payslip: PayslipData, password: str | None = None) -> None:
+        """
+        Store payslip fields; pass the password when the PDF is encrypted.
+        A failed write is logged and leaves the entry cached in memory only.
+        """
+        fields = asdict(payslip)
+        fields["date"] = payslip.date.isoformat()
+        entry: dict[str, Any] = {
+            "version": self.version,
+            "encrypted": password is not None,
+            "fields": fields,
+        }
+        if password is not None:
+            salt = secrets.token_bytes(16)
+            entry["salt"] = salt.hex()
+            entry["verifier"] = self._verifier(password, salt)
+
+        self._remember(digest, entry)
+        path = self._path(digest)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+            self._evict()
+        except OSError as e:
+            logger.warning("Could not cache payslip %s: %s", digest, e)
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        for entry in self._files():
+            os.remove(entry.path)
+
+    def _entry(self, digest: str) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                self._entries.move_to_end(digest)
+                return entry
+        try:
+            with open(self._path(digest), encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("version") != self.version:
+            return None
+        self._remember(digest, entry)
+        return entry
+
+    def _remember(self, digest: str, entry: dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[digest] = entry
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                _ = self._entries.popitem(last=False)
+
+    def _verifier(self, password: str, salt: bytes) -> str:
+        return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, self.iterations).hex()
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def _files(self) -> list[os.DirEntry[str]]:
+        try:
+            with os.scandir(self.directory) as entries:
+                return [e for e in entries if e.name.endswith(".json")]
+        except OSError:
+            return []
+
+    def _evict(self) -> None:
+        with self._lock:
+            files = sorted(self._files(), key=lambda e: e.stat().st_mtime)
+            for stale in files[:max(0, len(files) - self.max_entries)]:
+                os.remove(stale.path)
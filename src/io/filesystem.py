@@ -1,37 +1,415 @@
+import importlib.util
+import os
+import pickle
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Generator, Iterable, Iterator
+from typing import Any, Literal
+
+import numpy as np
+import openpyxl
 import pandas as pd
 import pypdf
 
-from src.core.pdf import extract_gross_pay, extract_net_pay, extract_payslip_date
+from src.core.categories import CATEGORIES_PATH, get_stats
+from src.core.excel import PipelinePlan
+from src.core.memo import CategoryMemo
+from src.core.rules import RuleSet, hash_content
+from src.io.cache import PayslipCache, StatementCache, hash_file
+from src.io.xlsx import iter_sheet_rows
+from src.core.pdf import PAYSLIP_FIELDS, REQUIRED_PAYSLIP_FIELDS, PayslipLayout, find_fields
 from src.models.pdf import PayslipData
 
+ExcelEngine = Literal["openpyxl", "openpyxl-readonly", "calamine", "xml"]
+StreamingEngine = Literal["openpyxl-readonly", "xml"]
 
-def read_excel(file_path: str, skiprows: int = 3) -> pd.DataFrame:
-    return pd.read_excel(file_path, skiprows=skiprows)
+PAYSLIP_LAYOUT = PayslipLayout()
+RULES_ARTIFACT_PATH = ".cache/categories.rules.pkl"
 
 
-def write_csv(dataframe: pd.DataFrame, output_path: str) -> None:
-    dataframe.to_csv(output_path, index=False)
+DEFAULT_ENGINE: ExcelEngine = "openpyxl-readonly"
+# Engines preferred_engine may pick; the xml parser is opt-in by name only
+CANDIDATE_ENGINES: tuple[ExcelEngine, ...] = ("openpyxl-readonly", "calamine")
 
+_measured_engine: ExcelEngine | None = None  # pylint: disable=invalid-name
 
-def decrypt_pdf(pdf_path: str, password: str) -> None:
-    reader = pypdf.PdfReader(pdf_path)
-    if reader.is_encrypted:
-        _ = reader.decrypt(password)
-        writer = pypdf.PdfWriter()
-        for page in reader.pages:
-            _ = writer.add_page(page)
-        with open(pdf_path, "wb") as f:
-            _ = writer.write(f)
 
+def available_engines(engines: Iterable[ExcelEngine] = CANDIDATE_ENGINES) -> list[ExcelEngine]:
+    return [
+        engine
+        for engine in engines
+        if engine != "calamine" or importlib.util.find_spec("python_calamine") is not None
+    ]
 
-def extract_payslip_data(pdf_path: str) -> PayslipData:
-    reader = pypdf.PdfReader(pdf_path)
-    text = ""
-    for page in reader.pages:
-        text += page.extract_text() + "\n"
-
-    return PayslipData(
-        date=extract_payslip_date(text),
-        taxable_income=extract_gross_pay(text),
-        net_to_bank=extract_net_pay(text),
+
+def time_engines(
+    file_path: str, engines: Iterable[ExcelEngine], skiprows: int = 3, repeat: int = 1
+) -> dict[ExcelEngine, float]:
+    """Best of repeat wall-clock seconds for each engine to read file_path."""
+    timings: dict[ExcelEngine, float] = {}
+    for engine in engines:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            _ = read_excel(file_path, skiprows=skiprows, engine=engine)
+            best = min(best, time.perf_counter() - start)
+        timings[engine] = best
+    return timings
+
+
+def preferred_engine(sample_path: str | None = None) -> ExcelEngine:
+    """
+    Engine to read statements with.
+    openpyxl's read_only reader is the default. Given a sample workbook, the
+    available candidates are timed on it once per process and the fastest one
+    is kept from then on.
+    """
+    global _measured_engine  # pylint: disable=global-statement
+    if _measured_engine is not None:
+        return _measured_engine
+    if sample_path is None or not os.path.exists(sample_path):
+        return DEFAULT_ENGINE
+
+    engine = DEFAULT_ENGINE
+    candidates = available_engines()
+    if len(candidates) > 1:
+        timings = time_engines(sample_path, candidates)
+        engine = min(timings, key=timings.__getitem__)
+    _measured_engine = engine
+    return engine
+
+
+def read_excel(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    file_path: str,
+    skiprows: int = 3,
+    usecols: list[str] | None = None,
+    dtype: dict[str, str] | None = None,
+    required: list[str] | None = None,
+    engine: ExcelEngine = "openpyxl",
+) -> pd.DataFrame:
+    if engine in ("openpyxl-readonly", "xml"):
+        batches = iter_excel_batches(
+            file_path,
+            skiprows=skiprows,
+            batch_size=sys.maxsize,
+            usecols=usecols,
+            dtype=dtype,
+            required=required,
+            engine=engine,
+        )
+        return next(batches, pd.DataFrame(columns=usecols or []))
+    if engine in ("openpyxl", "calamine"):
+        dataframe = pd.read_excel(
+            file_path, skiprows=skiprows, usecols=usecols, dtype=dtype, engine=engine
+        )
+        if required:
+            dataframe = dataframe.dropna(subset=required)
+        return dataframe
+    raise ValueError(f"Unknown Excel engine: {engine}")
+
+
+def iter_excel_batches(  # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals
+    file_path: str,
+    skiprows: int = 3,
+    batch_size: int = 10_000,
+    usecols: list[str] | None = None,
+    dtype: dict[str, str] | None = None,
+    required: list[str] | None = None,
+    engine: StreamingEngine = "openpyxl-readonly",
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream the first sheet in batches of at most batch_size rows.
+    Rows come from openpyxl's read_only mode or straight from the sheet XML, so
+    only one batch is held in memory. Rows missing a required column are skipped
+    while reading, and each batch keeps the row numbers read_excel would have
+    assigned as its index.
+    """
+    rows = iter_sheet_rows(file_path) if engine == "xml" else _iter_openpyxl_rows(file_path)
+    try:
+        for _ in range(skiprows):
+            if next(rows, None) is None:
+                return
+
+        header = list(next(rows, ()))
+        columns = usecols if usecols is not None else [c for c in header if c is not None]
+        positions = [header.index(column) for column in columns]
+        required_positions = [header.index(column) for column in required or []]
+
+        batch: list[list[Any]] = []
+        index: list[int] = []
+        row_number = -1
+        for row in rows:
+            values = [row[i] if i < len(row) else None for i in range(len(header))]
+            if all(value is None for value in values):
+                continue
+            row_number += 1
+            if any(values[i] is None for i in required_positions):
+                continue
+            batch.append([_normalize_cell(values[i]) for i in positions])
+            index.append(row_number)
+            if len(batch) >= batch_size:
+                yield _to_batch_frame(batch, index, columns, dtype)
+                batch, index = [], []
+
+        if batch:
+            yield _to_batch_frame(batch, index, columns, dtype)
+    finally:
+        rows.close()
+
+
+def _iter_openpyxl_rows(file_path: str) -> Generator[tuple[Any, ...], None, None]:
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        sheet.reset_dimensions()
+        yield from sheet.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def _normalize_cell(value: Any) -> Any:
+    # Same coercion pandas applies to openpyxl cells: empty cells become NaN
+    # and whole floats become ints
+    if value is None:
+        return np.nan
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _to_batch_frame(
+    batch: list[list[Any]],
+    index: list[int],
+    columns: list[str],
+    dtype: dict[str, str] | None,
+) -> pd.DataFrame:
+    dataframe = pd.DataFrame(batch, columns=columns, index=index)
+    if dtype:
+        dataframe = dataframe.astype({k: v for k, v in dtype.items() if k in columns})
+    return dataframe
+
+
+def iter_statement_batches(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    file_path: str,
+    plan: PipelinePlan,
+    batch_size: int = 10_000,
+    skiprows: int = 3,
+    engine: StreamingEngine = "openpyxl-readonly",
+    rules: RuleSet | None = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream a workbook through the plan batch by batch, without the final sort.
+    Merge the batches with concat_batches to keep categorical text columns.
+    """
+    batches = iter_excel_batches(
+        file_path,
+        skiprows=skiprows,
+        batch_size=batch_size,
+        engine=engine,
+        **plan.read_options(),
     )
+    return plan.execute_batches(batches, rules)
+
+
+def read_statement(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    file_path: str,
+    plan: PipelinePlan,
+    skiprows: int = 3,
+    engine: ExcelEngine = "openpyxl",
+    cache: StatementCache | None = None,
+    rules: RuleSet | None = None,
+    read: Callable[..., pd.DataFrame] = read_excel,
+) -> pd.DataFrame:
+    """
+    Read only the columns the plan needs and run it with rules, by default the
+    installed rule set. With a cache, which needs the rules to key its entries,
+    the processed frame is reused while the workbook, the rules, the plan and
+    the engine are unchanged. read takes read_excel's arguments and lets the
+    caller parse the sheet elsewhere, e.g. in another process. Cached frames
+    are not served while categorization instrumentation is on, so every read
+    is counted.
+    """
+    key = ""
+    if cache is not None:
+        if rules is None:
+            raise ValueError("Caching a statement requires the rules it is categorized with")
+        key = cache.key(file_path, rules.digest, repr(plan), str(skiprows), engine)
+        cached = cache.get(key) if get_stats() is None else None
+        if cached is not None:
+            return cached
+
+    dataframe = read(file_path, skiprows=skiprows, engine=engine, **plan.read_options())
+    processed = plan.execute(dataframe, rules)
+    if cache is not None:
+        cache.put(key, processed)
+    return processed
+
+
+def write_csv(
+    dataframe: pd.DataFrame, output_path: str, date_format: str = "%Y-%m-%d"
+) -> None:
+    dataframe.to_csv(output_path, index=False, date_format=date_format)
+
+
+def load_cached_rules(
+    path: str = CATEGORIES_PATH, artifact_path: str = RULES_ARTIFACT_PATH
+) -> RuleSet:
+    """
+    Load the compiled rule set for categories.yaml.
+    A pickled RuleSet whose digest matches the YAML content is reused, so cold
+    starts skip parsing and compilation; otherwise it is rebuilt and re-saved.
+    """
+    try:
+        with open(path, "rb") as f:
+            content = f.read()
+    except OSError:
+        return RuleSet.compile({}, "")
+
+    digest = hash_content(content)
+    try:
+        with open(artifact_path, "rb") as f:
+            artifact = pickle.load(f)
+        if isinstance(artifact, RuleSet) and artifact.digest == digest:
+            return artifact
+    except Exception:  # pylint: disable=broad-exception-caught
+        # Missing, corrupt or incompatible artifacts are rebuilt below
+        pass
+
+    rules = RuleSet.from_yaml(content)
+    # A private temp file per writer, so concurrent pool workers cannot interleave
+    directory = os.path.dirname(artifact_path) or "."
+    tmp_path = None
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=directory, suffix=".tmp", delete=False) as f:
+            tmp_path = f.name
+            pickle.dump(rules, f)
+        os.replace(tmp_path, artifact_path)
+    except OSError:
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return rules
+
+
+def load_category_memo(path: str, rules_hash: str, maxsize: int = 4096) -> CategoryMemo:
+    memo = CategoryMemo(rules_hash, maxsize)
+    try:
+        with open(path, "rb") as f:
+            stored = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, ValueError):
+        # A truncated or incompatible memo is only a cold start
+        return memo
+
+    if isinstance(stored, dict) and stored.get("rules_hash") == rules_hash:
+        memo.update(stored.get("entries", []))
+    return memo
+
+
+def save_category_memo(memo: CategoryMemo, path: str) -> None:
+    with open(path, "wb") as f:
+        pickle.dump({"rules_hash": memo.rules_hash, "entries": memo.entries()}, f)
+
+
+def open_pdf(pdf_path: str, password: str | None = None) -> pypdf.PdfReader:
+    """
+    Parse a PDF once, decrypting it in memory when a password is given.
+    The file on disk is never rewritten; an encrypted reader opened without a
+    password still reports is_encrypted so callers can ask for one.
+    """
+    reader = pypdf.PdfReader(pdf_path)
+    if password and reader.is_encrypted:
+        unlock_pdf(reader, password)
+    return reader
+
+
+def unlock_pdf(reader: pypdf.PdfReader, password: str) -> None:
+    if reader.decrypt(password) == pypdf.PasswordType.NOT_DECRYPTED:
+        raise ValueError("Incorrect password")
+
+
+def read_payslip(
+    pdf_path: str, password: str = ""
+) -> tuple[bool, PayslipData | None, str | None]:
+    """
+    Open a payslip and extract its fields, unlocking it first when it is encrypted.
+    Returns whether it is encrypted, its fields, and why they could not be
+    extracted; an encrypted payslip without a password has neither. A file
+    that is not a readable PDF raises.
+    """
+    reader = open_pdf(pdf_path)
+    encrypted = reader.is_encrypted
+    if encrypted and not password:
+        return True, None, None
+    try:
+        if encrypted:
+            unlock_pdf(reader, password)
+        return encrypted, extract_payslip_data(reader), None
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        return encrypted, None, str(e)
+
+
+def extract_payslip_fields(
+    reader: pypdf.PdfReader,
+    names: Iterable[str] = PAYSLIP_FIELDS,
+    layout: PayslipLayout | None = None,
+) -> dict[str, Any]:
+    """
+    Extract page text lazily, stopping once the required fields among names
+    are found (or all of names, when none of them is required) and every other
+    pending field is one the layout saw missing from a whole payslip. Pages are
+    visited in the layout's order; where the fields turn up, and which ones a
+    scan of every page did not find, is fed back into it for the next payslip.
+    """
+    layout = layout if layout is not None else PAYSLIP_LAYOUT
+    names = list(names)
+    required = [name for name in names if name in REQUIRED_PAYSLIP_FIELDS] or names
+    found: dict[str, Any] = {}
+    pages: dict[str, int] = {}
+    page_order = layout.page_order(len(reader.pages))
+    visited = 0
+    for page_number in page_order:
+        pending = [name for name in names if name not in found]
+        if all(name in found for name in required) and layout.absent.issuperset(pending):
+            break
+        text = reader.pages[page_number].extract_text()
+        visited += 1
+        for name, value in find_fields(text, pending).items():
+            found[name] = value
+            pages[name] = page_number
+
+    scanned_all = visited == len(page_order)
+    layout.learn(pages, [name for name in names if name not in found] if scanned_all else ())
+    return found
+
+
+def extract_payslip_data(
+    reader: pypdf.PdfReader, layout: PayslipLayout | None = None
+) -> PayslipData:
+    fields = extract_payslip_fields(reader, layout=layout)
+    missing = [name for name in REQUIRED_PAYSLIP_FIELDS if name not in fields]
+    if missing:
+        raise ValueError(f"Could not find payslip fields: {', '.join(missing)}")
+    return PayslipData(**fields)
+
+
+def load_payslip(
+    pdf_path: str, password: str | None = None, cache: PayslipCache | None = None
+) -> PayslipData:
+    """
+    Open, decrypt and extract a payslip.
+    With a cache, a PDF whose bytes were seen before is answered from the
+    stored fields without parsing it, provided the password matches.
+    """
+    digest = ""
+    if cache is not None:
+        digest = hash_file(pdf_path)
+        cached = cache.get(digest, password)
+        if cached is not None:
+            return cached
+
+    reader = open_pdf(pdf_path, password)
+    payslip = extract_payslip_data(reader)
+    if cache is not None:
+        cache.put(digest, payslip, password if reader.is_encrypted else None)
+    return payslip
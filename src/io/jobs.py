@@ -0,0 +1,116 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Literal
+
+JobStatus = Literal["queued", "running", "succeeded", "failed"]
+ProgressCallback = Callable[[str, int, int], None]
+
+
+@dataclass
+class Job:  # pylint: disable=too-many-instance-attributes
+    """State of a background job, updated by its worker thread."""
+
+    id: str
+    kind: str
+    key: str
+    status: JobStatus = "queued"
+    stage: str | None = None
+    progress: dict[str, tuple[int, int]] = field(default_factory=dict)
+    message: str | None = None
+    error: str | None = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+
+    @property
+    def active(self) -> bool:
+        return self.status in ("queued", "running")
+
+    def to_dict(self) -> dict[str, object]:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": {
+                stage: {"done": done, "total": total}
+                for stage, (done, total) in self.progress.items()
+            },
+            "message": self.message,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobQueue:
+    """
+    In-process queue of background jobs run on a small thread pool.
+    Submitting a job whose kind and key match a queued or running one returns
+    that job instead of starting another; finished jobs are kept for polling
+    until max_finished newer ones have completed.
+    """
+
+    def __init__(self, max_workers: int = 1, max_finished: int = 64) -> None:
+        self.max_finished: int = max_finished
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._active: dict[tuple[str, str], Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(
+        self, kind: str, key: str, run: Callable[[ProgressCallback], str]
+    ) -> dict[str, object]:
+        """Queue run(progress) unless the same job is already pending; run returns the final message."""
+        with self._lock:
+            job = self._active.get((kind, key))
+            if job is not None:
+                return job.to_dict()
+            job = Job(id=uuid.uuid4().hex, kind=kind, key=key)
+            self._jobs[job.id] = job
+            self._active[(kind, key)] = job
+            snapshot = job.to_dict()
+
+        _ = self._executor.submit(self._run, job, run)
+        return snapshot
+
+    def status(self, job_id: str) -> dict[str, object] | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.to_dict() if job is not None else None
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job: Job, run: Callable[[ProgressCallback], str]) -> None:
+        def progress(stage: str, done: int, total: int) -> None:
+            with self._lock:
+                job.stage = stage
+                job.progress[stage] = (done, total)
+
+        with self._lock:
+            job.status = "running"
+        try:
+            message = run(progress)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            self._finish(job, "failed", error=str(e))
+        else:
+            self._finish(job, "succeeded", message=message)
+
+    def _finish(
+        self, job: Job, status: JobStatus, message: str | None = None, error: str | None = None
+    ) -> None:
+        with self._lock:
+            job.status = status
+            job.message = message
+            job.error = error
+            job.finished_at = time.time()
+            _ = self._active.pop((job.kind, job.key), None)
+
+            finished = [j for j in self._jobs.values() if not j.active]
+            for stale in finished[:max(0, len(finished) - self.max_finished)]:
+                del self._jobs[stale.id]
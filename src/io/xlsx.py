@@ -0,0 +1,171 @@
+import re
+import zipfile
+from collections.abc import Callable, Generator
+from datetime import datetime
+from typing import Any
+from xml.etree import ElementTree
+
+from openpyxl.utils.datetime import from_excel
+
+_MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PACKAGE_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+# Built-in number formats Excel renders as dates or times
+_BUILTIN_DATE_FORMATS = {14, 15, 16, 17, 18, 19, 20, 21, 22, 45, 46, 47}
+_DATE_TOKENS = re.compile(r"[dmyhs]", re.IGNORECASE)
+_FORMAT_LITERALS = re.compile(r'"[^"]*"|\[[^\]]*\]|\\.')
+# Characters XML cannot carry are written as _xHHHH_; _x005F_ escapes the underscore
+_ESCAPED_CHAR = re.compile(r"_x([0-9A-Fa-f]{4})_")
+
+_EPOCH_1900 = datetime(1899, 12, 30)
+_EPOCH_1904 = datetime(1904, 1, 1)
+
+
+def iter_sheet_rows(file_path: str) -> Generator[tuple[Any, ...], None, None]:
+    """
+    Stream the first worksheet of an .xlsx as tuples of cell values.
+    Parses the sheet XML directly with iterparse, decoding shared strings,
+    numbers, booleans and date-formatted serials the way openpyxl's read_only
+    values_only rows do. Strings also have their _xHHHH_ escapes decoded, as
+    calamine does. Gaps between rows are yielded as empty tuples.
+    """
+    with zipfile.ZipFile(file_path) as archive:
+        sheet_path, epoch = _first_sheet(archive)
+        shared_strings = _shared_strings(archive)
+        date_styles = _date_styles(archive)
+
+        with archive.open(sheet_path) as sheet:
+            last_row = 0
+            for _, element in ElementTree.iterparse(sheet, events=("end",)):
+                if element.tag != f"{_MAIN_NS}row":
+                    continue
+                row_number = int(element.get("r", last_row + 1))
+                for _ in range(last_row + 1, row_number):
+                    yield ()
+                last_row = row_number
+                yield _read_row(element, shared_strings, date_styles, epoch)
+                element.clear()
+
+
+def _first_sheet(archive: zipfile.ZipFile) -> tuple[str, datetime]:
+    workbook = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+    properties = workbook.find(f"{_MAIN_NS}workbookPr")
+    date1904 = properties is not None and properties.get("date1904") in ("1", "true")
+
+    sheet = workbook.find(f"{_MAIN_NS}sheets/{_MAIN_NS}sheet")
+    if sheet is None:
+        raise ValueError("Workbook has no worksheets")
+    relation_id = sheet.get(f"{_REL_NS}id")
+
+    relations = ElementTree.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+    for relation in relations.iter(f"{_PACKAGE_REL_NS}Relationship"):
+        if relation.get("Id") == relation_id:
+            target = relation.get("Target", "")
+            path = target.lstrip("/") if target.startswith("/") else f"xl/{target}"
+            return path, _EPOCH_1904 if date1904 else _EPOCH_1900
+    raise ValueError("Could not resolve the first worksheet")
+
+
+def _shared_strings(archive: zipfile.ZipFile) -> list[str]:
+    if "xl/sharedStrings.xml" not in archive.namelist():
+        return []
+    strings: list[str] = []
+    with archive.open("xl/sharedStrings.xml") as f:
+        for _, element in ElementTree.iterparse(f, events=("end",)):
+            if element.tag == f"{_MAIN_NS}si":
+                strings.append(_unescape(_text(element)))
+                element.clear()
+    return strings
+
+
+def _text(element: ElementTree.Element) -> str:
+    # Plain <t> or rich-text <r><t> runs; phonetic <rPh> hints are not content
+    parts = [t.text or "" for t in element.findall(f"{_MAIN_NS}t")]
+    parts += [t.text or "" for t in element.findall(f"{_MAIN_NS}r/{_MAIN_NS}t")]
+    return "".join(parts)
+
+
+def _unescape(text: str) -> str:
+    if "_x" not in text:
+        return text
+    return _ESCAPED_CHAR.sub(lambda match: chr(int(match.group(1), 16)), text)
+
+
+def _date_styles(archive: zipfile.ZipFile) -> set[int]:
+    if "xl/styles.xml" not in archive.namelist():
+        return set()
+    styles = ElementTree.fromstring(archive.read("xl/styles.xml"))
+
+    date_formats = set(_BUILTIN_DATE_FORMATS)
+    for number_format in styles.iter(f"{_MAIN_NS}numFmt"):
+        code = _FORMAT_LITERALS.sub("", number_format.get("formatCode", ""))
+        if _DATE_TOKENS.search(code):
+            date_formats.add(int(number_format.get("numFmtId", "-1")))
+
+    cell_formats = styles.find(f"{_MAIN_NS}cellXfs")
+    if cell_formats is None:
+        return set()
+    return {
+        position
+        for position, xf in enumerate(cell_formats.findall(f"{_MAIN_NS}xf"))
+        if int(xf.get("numFmtId", "0")) in date_formats
+    }
+
+
+def _read_row(
+    row: ElementTree.Element,
+    shared_strings: list[str],
+    date_styles: set[int],
+    epoch: datetime,
+) -> tuple[Any, ...]:
+    values: list[Any] = []
+    for cell in row.iter(f"{_MAIN_NS}c"):
+        reference = cell.get("r")
+        column = _column_index(reference) if reference else len(values)
+        values.extend([None] * (column - len(values)))
+        values.append(_read_cell(cell, shared_strings, date_styles, epoch))
+    return tuple(values)
+
+
+def _column_index(reference: str) -> int:
+    index = 0
+    for char in reference:
+        if not char.isalpha():
+            break
+        index = index * 26 + ord(char.upper()) - ord("A") + 1
+    return index - 1
+
+
+_TYPED_CELLS: dict[str, Callable[[str], Any]] = {
+    "str": _unescape,
+    "b": lambda value: value == "1",
+    "e": lambda value: None,
+    "d": datetime.fromisoformat,
+}
+
+
+def _read_cell(
+    cell: ElementTree.Element,
+    shared_strings: list[str],
+    date_styles: set[int],
+    epoch: datetime,
+) -> Any:
+    cell_type = cell.get("t", "n")
+    if cell_type == "inlineStr":
+        inline = cell.find(f"{_MAIN_NS}is")
+        return _unescape(_text(inline)) if inline is not None else None
+
+    value = cell.findtext(f"{_MAIN_NS}v")
+    if value is None:
+        return None
+    if cell_type == "s":
+        return shared_strings[int(value)]
+    if cell_type in _TYPED_CELLS:
+        return _TYPED_CELLS[cell_type](value)
+
+    number: int | float = float(value) if any(c in value for c in ".eE") else int(value)
+    if int(cell.get("s", "0")) in date_styles:
+        # Millisecond rounding, times of day and the 1900 leap-year bug, as openpyxl
+        return from_excel(number, epoch)
+    return number
@@ -7,3 +7,7 @@ class PayslipData:
     date: date
     taxable_income: float
     net_to_bank: float
+    income_tax: float | None = None
+    national_insurance: float | None = None
+    pension: float | None = None
+    overtime: float | None = None
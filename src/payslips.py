@@ -0,0 +1,42 @@
+import argparse
+import os
+import sys
+
+from dotenv import load_dotenv
+
+from src.io.batch import expand_payslip_paths, process_payslips
+
+_ = load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract a history of payslips in parallel")
+    parser.add_argument("patterns", nargs="+", help="Payslip directories or globs")
+    parser.add_argument("--password", default=os.getenv("PAYSLIP_PASSWORD"), help="Payslip password")
+    parser.add_argument("--output", default=None, help="Parquet history output path")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes")
+    args = parser.parse_args()
+
+    file_paths = [path for pattern in args.patterns for path in expand_payslip_paths(pattern)]
+    if not file_paths:
+        print("Error: No .pdf payslips matched.")
+        sys.exit(1)
+
+    print(f"Processing {len(file_paths)} payslips...")
+    batch = process_payslips(file_paths, args.password, max_workers=args.workers)
+
+    for payslip in batch.payslips:
+        print(f"{payslip.date}: taxable {payslip.taxable_income:,.2f}, net {payslip.net_to_bank:,.2f}")
+    for file_path, error in batch.failures.items():
+        print(f"Failed: {file_path}: {error}")
+
+    if args.output:
+        batch.to_frame().to_parquet(args.output)
+        print(f"Wrote {len(batch.payslips)} payslips to {args.output}")
+
+    if batch.failures and not batch.payslips:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
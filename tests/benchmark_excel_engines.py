@@ -0,0 +1,38 @@
+import argparse
+import os
+import tempfile
+
+from src.io.filesystem import ExcelEngine, available_engines, time_engines
+from tests.generate_mock_excel import generate_mock_excel
+
+ENGINES: list[ExcelEngine] = ["openpyxl", "openpyxl-readonly", "calamine", "xml"]
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+
+
+def benchmark(sizes: list[int], repeat: int = 3) -> dict[int, dict[ExcelEngine, float]]:
+    results: dict[int, dict[ExcelEngine, float]] = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sizes:
+            path = os.path.join(tmp_dir, f"statement_{size}.xlsx")
+            generate_mock_excel(path, num_rows=size)
+            results[size] = time_engines(path, available_engines(ENGINES), repeat=repeat)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Excel parsing engines")
+    parser.add_argument("sizes", nargs="*", type=int, default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    results = benchmark(args.sizes, args.repeat)
+    for size, timings in results.items():
+        fastest = min(timings, key=timings.__getitem__)
+        print(f"{size:>9} rows:")
+        for engine, seconds in sorted(timings.items(), key=lambda item: item[1]):
+            marker = " (fastest)" if engine == fastest else ""
+            print(f"    {engine:<18} {seconds:8.3f}s{marker}")
+
+
+if __name__ == "__main__":
+    main()
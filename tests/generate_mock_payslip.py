@@ -0,0 +1,103 @@
+import io
+import re
+
+import pypdf
+
+_HEBREW_RUN = re.compile(r"[\u0590-\u05FF](?:[\u0590-\u05FF ]*[\u0590-\u05FF])?")
+
+PAYSLIP_PAGES = [
+    [
+        "תלוש משכורת לחודש",
+        "01/2026",
+        "12,345.67",
+        "הכנסה חייבת",
+        "נטו לבנק9,876.54",
+        "שעות נוספות 321.00",
+        "מס הכנסה 1,234.00",
+        "ביטוח לאומי 456.78",
+        "קרן פנסיה 789.00",
+    ],
+    ["פירוט ניכויים"],
+]
+
+
+def _font_cmap(chars: list[str]) -> bytes:
+    entries = "\n".join(f"<{code:02X}> <{ord(char):04X}>" for code, char in enumerate(chars, start=1))
+    return (
+        "/CIDInit /ProcSet findresource begin\n12 dict begin\nbegincmap\n"
+        "/CMapName /Mock def\n1 begincodespacerange\n<01> <FF>\nendcodespacerange\n"
+        f"{len(chars)} beginbfchar\n{entries}\nendbfchar\n"
+        "endcmap\nCMapName currentdict /CMap defineresource pop\nend\nend\n"
+    ).encode()
+
+
+def _page_content(lines: list[str], codes: dict[str, int]) -> bytes:
+    parts = [b"BT /F1 12 Tf 14 TL 72 760 Td"]
+    for line in lines:
+        # Hebrew runs are stored in visual order, as real payslips draw them
+        visual = _HEBREW_RUN.sub(lambda m: m.group(0)[::-1], line)
+        encoded = "".join(f"{codes[char]:02X}" for char in visual)
+        parts.append(f"<{encoded}> Tj T*".encode())
+    parts.append(b"ET")
+    return b"\n".join(parts)
+
+
+def generate_mock_payslip(
+    output_file: str, pages: list[list[str]] | None = None, password: str | None = None
+) -> None:
+    """
+    Write a payslip-like PDF whose extracted text is the given lines.
+    Characters are drawn as single-byte codes mapped back to Unicode through a
+    ToUnicode CMap, so Hebrew survives text extraction without embedding a font.
+    """
+    pages = pages if pages is not None else PAYSLIP_PAGES
+    chars = sorted({char for lines in pages for line in lines for char in line})
+    codes = {char: code for code, char in enumerate(chars, start=1)}
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /ToUnicode 4 0 R >>",
+        _stream(_font_cmap(chars)),
+    ]
+    page_ids = []
+    for lines in pages:
+        content_id = len(objects) + 1
+        objects.append(_stream(_page_content(lines, codes)))
+        page_ids.append(len(objects) + 1)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode()
+
+    reader = pypdf.PdfReader(io.BytesIO(_document(objects)))
+    writer = pypdf.PdfWriter(clone_from=reader)
+    if password is not None:
+        writer.encrypt(password, algorithm="AES-128")
+    with open(output_file, "wb") as f:
+        _ = writer.write(f)
+
+
+def _stream(data: bytes) -> bytes:
+    return b"<< /Length %d >>\nstream\n%s\nendstream" % (len(data), data)
+
+
+def _document(objects: list[bytes]) -> bytes:
+    body = io.BytesIO()
+    _ = body.write(b"%PDF-1.7\n")
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(body.tell())
+        _ = body.write(b"%d 0 obj\n%s\nendobj\n" % (number, obj))
+    xref = body.tell()
+    _ = body.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        _ = body.write(b"%010d 00000 n \n" % offset)
+    _ = body.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return body.getvalue()
+
+
+if __name__ == "__main__":
+    generate_mock_payslip("payslip.pdf")
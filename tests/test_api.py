@@ -0,0 +1,228 @@
+import base64
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src import api
+from src.core.categories import (
+    disable_instrumentation,
+    enable_instrumentation,
+    get_category_memo,
+    set_category_memo,
+)
+from src.core.memo import CategoryMemo
+from src.io.cache import PayslipCache, StatementCache
+from src.io.jobs import JobQueue
+from tests.generate_mock_excel import generate_mock_excel
+from tests.generate_mock_payslip import generate_mock_payslip
+
+GOLDEN_FILE = "tests/data/golden_statement.xlsx"
+
+@pytest.fixture(scope="module", autouse=True)
+def process_pool():
+    yield
+    if api.PROCESS_POOL is not None:
+        api.PROCESS_POOL.shutdown(cancel_futures=True)
+        api.PROCESS_POOL = None
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    if not os.path.exists(GOLDEN_FILE):
+        os.makedirs(os.path.dirname(GOLDEN_FILE), exist_ok=True)
+        generate_mock_excel(GOLDEN_FILE)
+    statement = tmp_path / "data.xlsx"
+    shutil.copy(GOLDEN_FILE, statement)
+    monkeypatch.setattr(api, "STATEMENT_PATH", str(statement))
+    monkeypatch.setattr(api, "PAYSLIP_PATH", str(tmp_path / "payslip.pdf"))
+    monkeypatch.setattr(api, "STATEMENT_CACHE", StatementCache(str(tmp_path / "statements")))
+    monkeypatch.setattr(api, "PAYSLIP_CACHE", PayslipCache(str(tmp_path / "payslips")))
+    api.DATA_RESPONSES.clear()
+    yield TestClient(api.app)
+    api.DATA_RESPONSES.clear()
+
+def test_get_data_sends_etag_and_honours_if_none_match(client):
+    response = client.get("/api/data")
+    assert response.status_code == 200
+    assert response.json()["excel"]["metrics"]["trans_count"] == 980
+    assert response.json()["payslip"] is None
+    etag = response.headers["ETag"]
+
+    cached = client.get("/api/data", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+    assert cached.content == b""
+
+def test_get_data_etag_changes_with_the_workbook(client):
+    etag = client.get("/api/data").headers["ETag"]
+    generate_mock_excel(api.STATEMENT_PATH, num_rows=100, missing_categories=5, missing_amounts=2)
+
+    response = client.get("/api/data", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()["excel"]["metrics"]["trans_count"] == 98
+
+def test_get_data_does_not_cache_errors(client):
+    with open(api.STATEMENT_PATH, "wb") as f:
+        _ = f.write(b"not a workbook")
+
+    response = client.get("/api/data")
+    assert response.status_code == 200
+    assert "error" in response.json()["excel"]
+    assert "ETag" not in response.headers
+    assert response.headers["Cache-Control"] == "no-store"
+    assert not api.DATA_RESPONSES
+
+def test_get_data_categorizes_in_this_process(client):
+    previous = get_category_memo()
+    set_category_memo(CategoryMemo(""))
+    try:
+        response = client.get("/api/data")
+        memo_entries = len(get_category_memo())
+    finally:
+        set_category_memo(previous)
+
+    assert response.json()["excel"]["metrics"]["trans_count"] == 980
+    assert memo_entries > 0
+
+def test_category_stats_count_cached_statements(client):
+    _ = client.get("/api/data")
+    api.DATA_RESPONSES.clear()
+    stats = enable_instrumentation()
+    try:
+        _ = client.get("/api/data")
+        report = client.get("/api/stats/categories").json()
+    finally:
+        disable_instrumentation()
+
+    assert sum(stats.category_hits.values()) + stats.fallthroughs == 980
+    assert not set(report["category_hits"]) & set(report["unused_categories"])
+    assert report["keyword_hits"]
+
+def test_get_data_rebuilds_a_broken_pool(client):
+    pool = api._process_pool()
+    with pytest.raises(BrokenProcessPool):
+        pool.submit(os._exit, 1).result()
+
+    response = client.get("/api/data")
+    assert response.json()["excel"]["metrics"]["trans_count"] == 980
+    assert api.PROCESS_POOL is not pool
+
+def test_get_data_answers_cached_payslips_without_the_pool(client, monkeypatch):
+    generate_mock_payslip(api.PAYSLIP_PATH, password="secret")
+    locked = client.get("/api/data").json()["payslip"]
+    assert locked["requires_password"] is True
+    assert locked["data"] is None
+
+    first = client.get("/api/data", params={"payslip_password": "secret"}).json()["payslip"]
+    assert first["data"]["net_to_bank"] == 9876.54
+
+    def no_pool(*_args, **_kwargs):
+        raise AssertionError("the worker pool should not be used")
+    monkeypatch.setattr(api, "_in_pool", no_pool)
+    api.DATA_RESPONSES.clear()
+
+    cached = client.get("/api/data", params={"payslip_password": "secret"}).json()["payslip"]
+    assert cached == first
+    assert client.get("/api/data").json()["payslip"] == locked
+
+def test_get_data_reports_a_wrong_payslip_password(client):
+    generate_mock_payslip(api.PAYSLIP_PATH, password="secret")
+    payslip = client.get("/api/data", params={"payslip_password": "wrong"}).json()["payslip"]
+    assert payslip["requires_password"] is True
+    assert payslip["data"] is None
+    assert payslip["error"] == "Decryption failed: Incorrect password"
+
+def test_transactions_pages_follow_the_cursor(client):
+    first = client.get("/api/transactions", params={"limit": 300, "sort": "Amount", "order": "desc"}).json()
+    assert first["total"] == 980
+    assert len(first["items"]) == 300
+
+    items = list(first["items"])
+    cursor = first["next_cursor"]
+    while cursor is not None:
+        page = client.get("/api/transactions", params={"cursor": cursor}).json()
+        assert page["limit"] == 300
+        items.extend(page["items"])
+        cursor = page["next_cursor"]
+
+    assert len(items) == 980
+    amounts = [item["Amount"] for item in items]
+    assert amounts == sorted(amounts, reverse=True)
+    assert all(len(item["Date"]) == 10 for item in items)
+
+def test_transactions_stream_as_ndjson(client):
+    response = client.get("/api/transactions", params={"format": "ndjson", "offset": 900})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 80
+    assert set(rows[0]) == {"Date", "Payee", "Amount", "Category"}
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"offset": -1, "limit": 10, "sort": "Category", "order": "asc"},
+        {"offset": 0, "limit": 0, "sort": "Category", "order": "asc"},
+        {"offset": 0, "limit": 5001, "sort": "Category", "order": "asc"},
+        {"offset": 0, "limit": 10, "sort": "Secret", "order": "asc"},
+        {"offset": 0},
+    ],
+)
+def test_transactions_reject_invalid_cursors(client, payload):
+    cursor = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+    response = client.get("/api/transactions", params={"cursor": cursor})
+    assert response.status_code == 400
+
+    assert client.get("/api/transactions", params={"cursor": "not-base64!"}).status_code == 400
+
+def wait_for_job(client, job_id, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = client.get(f"/api/jobs/{job_id}").json()
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        time.sleep(0.01)
+    raise TimeoutError(job_id)
+
+@pytest.fixture
+def sync_jobs(monkeypatch):
+    queue = JobQueue()
+    monkeypatch.setattr(api, "SYNC_JOBS", queue)
+    yield queue
+    queue.shutdown()
+
+def test_sync_payslip_reports_unreadable_pdf_as_job_error(client, sync_jobs):
+    with open(api.PAYSLIP_PATH, "wb") as f:
+        _ = f.write(b"not a pdf")
+
+    response = client.post("/api/sync/payslip", json={"password": "secret"})
+    assert response.status_code == 202
+
+    job = wait_for_job(client, response.json()["id"])
+    assert job["status"] == "failed"
+    assert job["error"]
+
+def test_sync_payslip_dedups_only_the_same_password(client, sync_jobs, monkeypatch):
+    generate_mock_payslip(api.PAYSLIP_PATH, password="secret")
+    release = threading.Event()
+    opened = api.open_pdf
+    imported = []
+    monkeypatch.setattr(api, "open_pdf", lambda path: release.wait(5) and opened(path))
+    monkeypatch.setattr(api, "import_payslip_to_actual", lambda data, progress: imported.append(data))
+
+    wrong = client.post("/api/sync/payslip", json={"password": "wrong"}).json()
+    again = client.post("/api/sync/payslip", json={"password": "wrong"}).json()
+    right = client.post("/api/sync/payslip", json={"password": "secret"}).json()
+    release.set()
+
+    assert again["id"] == wrong["id"]
+    assert right["id"] != wrong["id"]
+    assert wait_for_job(client, wrong["id"])["error"] == "Incorrect password"
+    assert wait_for_job(client, right["id"])["status"] == "succeeded"
+    assert len(imported) == 1
@@ -0,0 +1,62 @@
+import os
+import shutil
+import pytest
+from src.core.excel import PipelinePlan
+from src.io.batch import (
+    expand_payslip_paths,
+    expand_statement_paths,
+    ingest_statements,
+    process_payslips,
+)
+from tests.generate_mock_excel import generate_mock_excel
+from tests.generate_mock_payslip import generate_mock_payslip
+
+GOLDEN_FILE = "tests/data/golden_statement.xlsx"
+
+@pytest.mark.parametrize("text_dtype", ["object", "category"])
+def test_ingest_statements_merges_with_provenance(tmp_path, text_dtype):
+    if not os.path.exists(GOLDEN_FILE):
+        os.makedirs(os.path.dirname(GOLDEN_FILE), exist_ok=True)
+        generate_mock_excel(GOLDEN_FILE)
+    shutil.copy(GOLDEN_FILE, tmp_path / "visa.xlsx")
+    # A smaller statement sees its categories in a different order
+    generate_mock_excel(str(tmp_path / "mastercard.xlsx"), num_rows=30, missing_categories=2, missing_amounts=1)
+
+    file_paths = expand_statement_paths(str(tmp_path))
+    assert [os.path.basename(p) for p in file_paths] == ["mastercard.xlsx", "visa.xlsx"]
+
+    df = ingest_statements(file_paths, PipelinePlan(text_dtype=text_dtype), max_workers=2)
+    assert len(df) == 980 + 29
+    assert set(df["Source"]) == {"visa", "mastercard"}
+    assert df["File"].str.endswith(".xlsx").all()
+    categories = df["Category"].astype(str).tolist()
+    assert categories == sorted(categories)
+
+def test_ingest_statements_empty():
+    df = ingest_statements([])
+    assert df.empty
+    assert "Source" in df.columns
+
+def test_process_payslips_orders_by_date_and_reports_failures(tmp_path):
+    january = [["תלוש משכורת לחודש", "01/2026", "10,000.00", "הכנסה חייבת", "נטו לבנק8,000.00"]]
+    december = [["תלוש משכורת לחודש", "12/2025", "9,000.00", "הכנסה חייבת", "נטו לבנק7,000.00"]]
+    generate_mock_payslip(str(tmp_path / "payslip_a.pdf"), january, password="secret")
+    generate_mock_payslip(str(tmp_path / "payslip_b.pdf"), december, password="secret")
+    (tmp_path / "payslip_c.pdf").write_bytes(b"not a pdf")
+
+    file_paths = expand_payslip_paths(str(tmp_path))
+    batch = process_payslips(file_paths, "secret", max_workers=2)
+
+    assert [p.net_to_bank for p in batch.payslips] == [7000.0, 8000.0]
+    assert [os.path.basename(f) for f in batch.files] == ["payslip_b.pdf", "payslip_a.pdf"]
+    assert list(batch.failures) == [str(tmp_path / "payslip_c.pdf")]
+
+    history = batch.to_frame()
+    assert history["net_to_bank"].tolist() == [7000.0, 8000.0]
+    assert history["date"].dt.month.tolist() == [1, 2]
+    assert history["overtime"].isna().all()
+
+def test_process_payslips_empty():
+    batch = process_payslips([])
+    assert batch.payslips == []
+    assert batch.to_frame().empty
@@ -1,11 +1,35 @@
 import pandas as pd
 from src.core.categories import (
     map_category, 
+    map_categories,
+    map_categories_cached,
+    map_categories_distinct,
+    categorization_report,
+    get_category_memo,
+    enable_instrumentation,
+    disable_instrumentation,
     check_reimbursable, 
     check_rent, 
     check_keywords
 )
 
+EQUIVALENCE_ROWS = [
+    ("Wolt", -49.0, "מסעדות"),
+    ("Paybox", 3000.0, "שונות"),
+    ("Paybox", 850.0, "שונות"),
+    ("Paybox", 50.0, "שונות"),
+    ("מכון אקדמי טכנולוגי חולון", 1331.66, "מוסדות"),
+    ("הי ביז poalim wonder", 92.0, "תעשיה ומכירות"),
+    ("IHERB IHERB.COM", 236.38, "מזון ומשקאות"),
+    ("Google Our Groceries", 3.3, "תקשורת ומחשבים"),
+    ("hit", 10.0, "Unknown"),
+    ("white hit", 10.0, "Unknown"),
+    ("חול", 10.0, "Unknown"),
+    ("random", 10.0, "Subscriptions"),
+    ("Random Store", 100.0, None),
+    ("", 100.0, ""),
+]
+
 def create_row(payee="", amount=0.0, category="Unknown"):
     return pd.Series({"Payee": payee, "Amount": amount, "Category": category})
 
@@ -149,3 +173,81 @@ def test_map_category_integration():
     # 7. Case Sensitivity
     assert map_category(create_row("wolt", 50.0, "Unknown")) == "Eating out"
     assert map_category(create_row("WOLT", 50.0, "Unknown")) == "Eating out"
+
+def test_map_category_rule_precedence():
+    # Bank category of an earlier category beats a later substring keyword
+    assert map_category(create_row("wolt", 50.0, "ריהוט ובית")) == "Home & Decor"
+    # Exact match of a later category loses to an earlier bank category
+    assert map_category(create_row("hit", 50.0, "מסעדות")) == "Eating out"
+    assert map_category(create_row("hit", 50.0, "Unknown")) == "Education & Learning"
+
+def test_map_categories_matches_map_category():
+    df = pd.DataFrame(EQUIVALENCE_ROWS, columns=["Payee", "Amount", "Category"])
+    expected = df.apply(map_category, axis=1).tolist()
+    assert map_categories(df).tolist() == expected
+    assert map_categories_cached(df).tolist() == expected
+    assert map_categories_distinct(df).tolist() == expected
+
+def test_instrumentation_counts_rules():
+    stats = enable_instrumentation()
+    try:
+        map_category(create_row("wolt", 50.0, "Unknown"))
+        map_category(create_row("Random Store", 100.0, "שונות"))
+        map_category(create_row("some expense", -5.0, "Unknown"))
+        df = pd.DataFrame([("netflix", 50.0, "Unknown")], columns=["Payee", "Amount", "Category"])
+        map_categories(df)
+    finally:
+        disable_instrumentation()
+
+    assert stats.category_hits["Eating out"] == 1
+    assert stats.category_hits["Subscriptions"] == 1
+    assert stats.category_hits["Reimburseable"] == 1
+    assert stats.keyword_hits["wolt"] == 1
+    assert stats.fallthroughs == 1
+    assert stats.stage_calls["check_keywords"] == 3
+
+def test_vectorized_instrumentation_counts_the_same_keywords():
+    df = pd.DataFrame(EQUIVALENCE_ROWS, columns=["Payee", "Amount", "Category"])
+    row_stats = enable_instrumentation()
+    try:
+        _ = df.apply(map_category, axis=1)
+    finally:
+        disable_instrumentation()
+    vectorized_stats = enable_instrumentation()
+    try:
+        _ = map_categories(df)
+    finally:
+        disable_instrumentation()
+
+    assert vectorized_stats.keyword_hits == row_stats.keyword_hits
+    assert vectorized_stats.category_hits == row_stats.category_hits
+    assert vectorized_stats.fallthroughs == row_stats.fallthroughs
+    assert vectorized_stats.keyword_hits["e:hit"] == 1
+
+def test_instrumentation_bypasses_a_warm_memo():
+    df = pd.DataFrame([("wolt", 50.0, "Unknown")] * 3, columns=["Payee", "Amount", "Category"])
+    _ = map_categories_cached(df)
+    hits = get_category_memo().stats()["hits"]
+
+    stats = enable_instrumentation()
+    try:
+        _ = map_categories_cached(df)
+        _ = map_categories_distinct(df)
+    finally:
+        disable_instrumentation()
+
+    assert stats.keyword_hits["wolt"] == 6
+    assert get_category_memo().stats()["hits"] == hits
+
+def test_report_lists_unused_rules_only_after_counting():
+    stats = enable_instrumentation()
+    try:
+        assert categorization_report()["unused_categories"] is None
+        map_category(create_row("wolt", 50.0, "Unknown"))
+        report = categorization_report()
+    finally:
+        disable_instrumentation()
+
+    assert stats.category_hits["Eating out"] == 1
+    assert "Eating out" not in report["unused_categories"]
+    assert "wolt" not in report["unused_keywords"]
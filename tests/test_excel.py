@@ -1,8 +1,13 @@
 import pytest
 import os
+import pandas as pd
 from src.core.excel import (
     standardize_columns,
     discard_row_if_amount_missing, 
+    format_date_column,
+    parse_date_column,
+    remap_categories,
+    run_pipeline,
     sort_by_category
 )
 from src.io.filesystem import read_excel
@@ -40,3 +45,35 @@ def test_sort_by_category(prepared_df):
     
     categories = sorted_df["Category"].dropna().tolist()
     assert categories == sorted(categories)
+
+def test_remap_categories_modes_agree(prepared_df):
+    df = discard_row_if_amount_missing(prepared_df)
+    row_df = remap_categories(df, mode="row")
+    vectorized_df = remap_categories(df, mode="vectorized")
+
+    assert row_df["Category"].tolist() == vectorized_df["Category"].tolist()
+
+def test_run_pipeline_matches_piped_stages(raw_df):
+    piped = (
+        raw_df.pipe(standardize_columns)
+        .pipe(discard_row_if_amount_missing)
+        .pipe(parse_date_column)
+        .pipe(remap_categories)
+        .pipe(sort_by_category)
+    )
+    fused = run_pipeline(raw_df)
+
+    pd.testing.assert_frame_equal(fused, piped)
+    assert pd.api.types.is_datetime64_any_dtype(fused["Date"])
+    assert "Payee" not in raw_df.columns
+
+def test_run_pipeline_parses_day_first_text_dates(raw_df):
+    text_df = raw_df.copy()
+    text_df["תאריך\nעסקה"] = text_df["תאריך\nעסקה"].dt.strftime("%d/%m/%Y")
+
+    pd.testing.assert_frame_equal(run_pipeline(text_df), run_pipeline(raw_df))
+
+def test_format_date_column_at_output(prepared_df):
+    df = parse_date_column(prepared_df)
+    formatted = format_date_column(df)
+    assert formatted["Date"].iloc[0].startswith("2026-03-")
@@ -1,10 +1,36 @@
 import pandas as pd
+import pytest
 import os
-from src.io.filesystem import read_excel
-from src.core.excel import discard_row_if_amount_missing
+from datetime import date, datetime, time
+import openpyxl
+import pypdf
+from src.io import filesystem
+from src.core.categories import get_rules
+from src.core.pdf import PAYSLIP_FIELDS, PayslipLayout
+from src.core.rules import RuleSet
+from src.io.filesystem import (
+    DEFAULT_ENGINE,
+    available_engines,
+    extract_payslip_fields,
+    iter_statement_batches,
+    load_payslip,
+    open_pdf,
+    preferred_engine,
+    read_excel,
+    read_statement,
+)
+from src.core.excel import (
+    PipelinePlan,
+    concat_batches,
+    discard_row_if_amount_missing,
+    run_pipeline,
+)
+from src.io import cache as cache_module
+from src.io.cache import FileFingerprints, PayslipCache, StatementCache, hash_file
 from tests.generate_mock_excel import generate_mock_excel
+from tests.generate_mock_payslip import PAYSLIP_PAGES, generate_mock_payslip
 
-GOLDEN_FILE = "golden_statement.xlsx"
+GOLDEN_FILE = "tests/data/golden_statement.xlsx"
 VALUE_COL = "סכום\nחיוב"
 DATE_COL = "תאריך\nעסקה"
 
@@ -31,3 +57,299 @@ def test_read_golden_excel():
         
     assert pd.api.types.is_datetime64_any_dtype(df[DATE_COL])
     assert df[DATE_COL].iloc[0].year == 2026
+
+def test_read_statement_pushes_projection_into_reader():
+    if not os.path.exists(GOLDEN_FILE):
+        generate_mock_excel(GOLDEN_FILE)
+
+    plan = PipelinePlan()
+    projected = read_excel(GOLDEN_FILE, skiprows=3, **plan.read_options())
+    assert list(projected.columns) == list(plan.columns)
+    assert not projected[VALUE_COL].isna().any()
+
+    expected = run_pipeline(read_excel(GOLDEN_FILE, skiprows=3))
+    pd.testing.assert_frame_equal(read_statement(GOLDEN_FILE, plan), expected)
+
+@pytest.mark.parametrize("text_dtype", ["category", "string[pyarrow]"])
+def test_read_statement_text_dtypes(text_dtype):
+    if not os.path.exists(GOLDEN_FILE):
+        generate_mock_excel(GOLDEN_FILE)
+    if text_dtype == "string[pyarrow]":
+        pytest.importorskip("pyarrow")
+
+    expected = read_statement(GOLDEN_FILE, PipelinePlan()).sort_index()
+    df = read_statement(GOLDEN_FILE, PipelinePlan(text_dtype=text_dtype)).sort_index()
+
+    assert df["Payee"].dtype == text_dtype
+    assert df["Category"].dtype == text_dtype
+    assert df["Category"].astype(object).tolist() == expected["Category"].tolist()
+
+@pytest.mark.parametrize("text_dtype", ["object", "category"])
+def test_iter_statement_batches_matches_read_statement(text_dtype):
+    if not os.path.exists(GOLDEN_FILE):
+        generate_mock_excel(GOLDEN_FILE)
+
+    plan = PipelinePlan(text_dtype=text_dtype)
+    batches = list(iter_statement_batches(GOLDEN_FILE, plan, batch_size=300))
+    assert len(batches) == 4
+    assert all(len(batch) <= 300 for batch in batches)
+
+    merged = concat_batches(batches)
+    assert merged["Payee"].dtype == text_dtype
+    assert merged["Category"].dtype == text_dtype
+
+    expected = plan.execute_batch(read_excel(GOLDEN_FILE, skiprows=3, **plan.read_options()))
+    pd.testing.assert_frame_equal(
+        merged.astype({"Payee": object, "Category": object}),
+        expected.astype({"Payee": object, "Category": object}),
+    )
+
+@pytest.mark.parametrize("engine", ["openpyxl-readonly", "xml", "calamine"])
+def test_read_excel_engines_match_default(engine):
+    if not os.path.exists(GOLDEN_FILE):
+        generate_mock_excel(GOLDEN_FILE)
+    if engine == "calamine":
+        pytest.importorskip("python_calamine")
+
+    expected = read_excel(GOLDEN_FILE, skiprows=3)
+    pd.testing.assert_frame_equal(read_excel(GOLDEN_FILE, skiprows=3, engine=engine), expected)
+
+    plan = PipelinePlan()
+    pd.testing.assert_frame_equal(
+        read_statement(GOLDEN_FILE, plan, engine=engine),
+        read_statement(GOLDEN_FILE, plan),
+    )
+
+def _write_sheet(path, rows, formats):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    for _ in range(3):
+        sheet.append([])
+    for row in rows:
+        sheet.append(row)
+    for column, number_format in formats.items():
+        for cell in sheet[column][4:]:
+            cell.number_format = number_format
+    workbook.save(path)
+
+@pytest.mark.parametrize("engine", ["openpyxl-readonly", "xml", "calamine"])
+def test_read_excel_engines_match_on_dates_and_times(tmp_path, engine):
+    if engine == "calamine":
+        pytest.importorskip("python_calamine")
+    path = str(tmp_path / "dates.xlsx")
+    _write_sheet(
+        path,
+        [
+            ["When", "At", "Early"],
+            [datetime(2025, 1, 2, 3, 4, 5, 678900), time(13, 30, 15), datetime(1900, 1, 15)],
+            [datetime(2025, 12, 31, 23, 59, 59, 999600), time(0, 0, 1), datetime(1900, 3, 1)],
+        ],
+        {"A": "yyyy-mm-dd hh:mm:ss", "B": "hh:mm:ss", "C": "yyyy-mm-dd"},
+    )
+
+    expected = read_excel(path, skiprows=3)
+    assert isinstance(expected["At"].iloc[0], time)
+    pd.testing.assert_frame_equal(read_excel(path, skiprows=3, engine=engine), expected)
+
+def test_xml_engine_decodes_escaped_characters(tmp_path):
+    path = str(tmp_path / "escaped.xlsx")
+    _write_sheet(path, [["Payee"], ["line_x000D_break"], ["_x005F_x0041_"]], {})
+
+    df = read_excel(path, skiprows=3, engine="xml")
+    assert df["Payee"].tolist() == ["line\rbreak", "_x0041_"]
+
+def test_preferred_engine_defaults_to_readonly_and_never_picks_xml(monkeypatch):
+    if not os.path.exists(GOLDEN_FILE):
+        generate_mock_excel(GOLDEN_FILE)
+    monkeypatch.setattr(filesystem, "_measured_engine", None)
+
+    assert preferred_engine() == DEFAULT_ENGINE
+    assert preferred_engine("missing.xlsx") == DEFAULT_ENGINE
+    measured = preferred_engine(GOLDEN_FILE)
+    assert measured in available_engines()
+    assert measured != "xml"
+    assert preferred_engine() == measured
+
+def test_read_statement_cache_round_trip(tmp_path):
+    if not os.path.exists(GOLDEN_FILE):
+        generate_mock_excel(GOLDEN_FILE)
+
+    cache = StatementCache(str(tmp_path))
+    plan = PipelinePlan(text_dtype="category")
+    rules = get_rules()
+    first = read_statement(GOLDEN_FILE, plan, cache=cache, rules=rules)
+    assert len(list(tmp_path.iterdir())) == 1
+
+    second = read_statement(GOLDEN_FILE, plan, cache=cache, rules=rules)
+    pd.testing.assert_frame_equal(second, first)
+
+    _ = read_statement(GOLDEN_FILE, plan, engine="xml", cache=cache, rules=rules)
+    other_rules = RuleSet.compile({"Food": ["wolt"]}, "other")
+    _ = read_statement(GOLDEN_FILE, plan, cache=cache, rules=other_rules)
+    assert len(list(tmp_path.iterdir())) == 3
+
+def test_read_statement_returns_data_when_cache_write_fails(tmp_path, caplog):
+    if not os.path.exists(GOLDEN_FILE):
+        generate_mock_excel(GOLDEN_FILE)
+    blocker = tmp_path / "not-a-directory"
+    blocker.write_text("")
+
+    cache = StatementCache(str(blocker))
+    plan = PipelinePlan()
+    df = read_statement(GOLDEN_FILE, plan, cache=cache, rules=get_rules())
+
+    pd.testing.assert_frame_equal(df, read_statement(GOLDEN_FILE, plan))
+    assert "Could not cache statement" in caplog.text
+
+def test_file_fingerprints_rehash_only_changed_files(tmp_path, monkeypatch):
+    path = tmp_path / "data.xlsx"
+    path.write_bytes(b"first")
+    hashed = []
+    monkeypatch.setattr(cache_module, "hash_file", lambda p: hashed.append(p) or hash_file(p))
+
+    fingerprints = FileFingerprints()
+    first = fingerprints.fingerprint(str(path))
+    assert fingerprints.fingerprint(str(path)) == first
+    assert len(hashed) == 1
+
+    path.write_bytes(b"second!")
+    assert fingerprints.fingerprint(str(path)) != first
+    assert len(hashed) == 2
+    assert fingerprints.fingerprint(str(tmp_path / "missing.xlsx")) == "missing"
+
+def test_statement_cache_evicts_to_size_bound(tmp_path):
+    cache = StatementCache(str(tmp_path), max_bytes=1)
+    cache.put("a", pd.DataFrame({"Amount": [1.0, 2.0]}))
+    assert cache.get("a") is None
+    assert list(tmp_path.iterdir()) == []
+
+def test_load_payslip_decrypts_in_memory(tmp_path):
+    pdf_path = str(tmp_path / "payslip.pdf")
+    generate_mock_payslip(pdf_path, password="secret")
+    with open(pdf_path, "rb") as f:
+        original = f.read()
+
+    payslip = load_payslip(pdf_path, "secret")
+
+    assert payslip.date == date(2026, 2, 1)
+    assert payslip.taxable_income == 12345.67
+    assert payslip.net_to_bank == 9876.54
+    assert payslip.overtime == 321.0
+    assert payslip.income_tax == 1234.0
+    assert payslip.national_insurance == 456.78
+    assert payslip.pension == 789.0
+    with open(pdf_path, "rb") as f:
+        assert f.read() == original
+
+def test_open_pdf_reports_encryption(tmp_path):
+    pdf_path = str(tmp_path / "payslip.pdf")
+    generate_mock_payslip(pdf_path, password="secret")
+
+    assert open_pdf(pdf_path).is_encrypted
+    with pytest.raises(ValueError):
+        load_payslip(pdf_path, "wrong")
+
+def test_load_unencrypted_payslip(tmp_path):
+    pdf_path = str(tmp_path / "payslip.pdf")
+    generate_mock_payslip(pdf_path)
+
+    assert load_payslip(pdf_path).net_to_bank == 9876.54
+
+@pytest.fixture
+def extracted(monkeypatch):
+    pages: list[int] = []
+    extract_text = pypdf.PageObject.extract_text
+    def counting_extract_text(page, *args, **kwargs):
+        pages.append(page.page_number)
+        return extract_text(page, *args, **kwargs)
+    monkeypatch.setattr(pypdf.PageObject, "extract_text", counting_extract_text)
+    return pages
+
+def test_payslip_extraction_stops_early_and_learns_pages(tmp_path, extracted):
+    pdf_path = str(tmp_path / "payslip.pdf")
+    generate_mock_payslip(pdf_path, pages=[["כיסוי"], PAYSLIP_PAGES[0], ["נספח"], ["נספח"]])
+
+    layout = PayslipLayout()
+    fields = extract_payslip_fields(open_pdf(pdf_path), layout=layout)
+    assert fields["net_to_bank"] == 9876.54
+    assert extracted == [0, 1]
+    assert layout.pages == {name: 1 for name in PAYSLIP_FIELDS}
+
+    extracted.clear()
+    assert extract_payslip_fields(open_pdf(pdf_path), layout=layout) == fields
+    assert extracted == [1]
+
+def test_payslip_extraction_finds_optional_fields_on_later_pages(tmp_path, extracted):
+    pdf_path = str(tmp_path / "payslip.pdf")
+    summary = [line for line in PAYSLIP_PAGES[0] if not line.startswith("מס הכנסה")]
+    generate_mock_payslip(pdf_path, pages=[summary, ["מס הכנסה 1,234.00"], ["נספח"]])
+
+    layout = PayslipLayout()
+    assert extract_payslip_fields(open_pdf(pdf_path), layout=layout)["income_tax"] == 1234.0
+    assert layout.pages["income_tax"] == 1
+    assert layout.absent == set()
+
+    extracted.clear()
+    assert extract_payslip_fields(open_pdf(pdf_path), layout=layout)["income_tax"] == 1234.0
+    assert extracted == [0, 1]
+
+def test_payslip_extraction_remembers_fields_missing_from_every_page(tmp_path, extracted):
+    pdf_path = str(tmp_path / "payslip.pdf")
+    summary = [line for line in PAYSLIP_PAGES[0] if not line.startswith("מס הכנסה")]
+    generate_mock_payslip(pdf_path, pages=[summary, ["נספח"], ["נספח"]])
+
+    layout = PayslipLayout()
+    assert "income_tax" not in extract_payslip_fields(open_pdf(pdf_path), layout=layout)
+    assert extracted == [0, 1, 2]
+    assert layout.absent == {"income_tax"}
+
+    extracted.clear()
+    assert "income_tax" not in extract_payslip_fields(open_pdf(pdf_path), layout=layout)
+    assert extracted == [0]
+
+def test_payslip_cache_skips_pypdf_for_known_bytes(tmp_path, monkeypatch):
+    pdf_path = str(tmp_path / "payslip.pdf")
+    generate_mock_payslip(pdf_path, password="secret")
+    cache = PayslipCache(str(tmp_path / "cache"))
+    payslip = load_payslip(pdf_path, "secret", cache)
+
+    def no_pypdf(*_args, **_kwargs):
+        raise AssertionError("pypdf should not be used")
+    monkeypatch.setattr(pypdf, "PdfReader", no_pypdf)
+
+    fresh = PayslipCache(str(tmp_path / "cache"))
+    assert load_payslip(pdf_path, "secret", fresh) == payslip
+    assert fresh.encrypted(hash_file(pdf_path)) is True
+    with pytest.raises(AssertionError):
+        load_payslip(pdf_path, "wrong", fresh)
+
+def test_payslip_cache_persists_only_fields(tmp_path):
+    pdf_path = str(tmp_path / "payslip.pdf")
+    generate_mock_payslip(pdf_path, password="secret")
+    cache = PayslipCache(str(tmp_path / "cache"))
+    _ = load_payslip(pdf_path, "secret", cache)
+
+    (stored,) = (tmp_path / "cache").iterdir()
+    content = stored.read_text(encoding="utf-8")
+    assert "secret" not in content
+    assert "נטו" not in content
+    assert '"net_to_bank": 9876.54' in content
+
+def test_payslip_cache_misses_entries_from_other_field_specs(tmp_path):
+    pdf_path = str(tmp_path / "payslip.pdf")
+    generate_mock_payslip(pdf_path)
+    _ = load_payslip(pdf_path, cache=PayslipCache(str(tmp_path / "cache")))
+    digest = hash_file(pdf_path)
+
+    assert PayslipCache(str(tmp_path / "cache")).get(digest) is not None
+    assert PayslipCache(str(tmp_path / "cache"), version="other").get(digest) is None
+
+def test_load_payslip_returns_data_when_cache_write_fails(tmp_path, caplog):
+    pdf_path = str(tmp_path / "payslip.pdf")
+    generate_mock_payslip(pdf_path)
+    blocker = tmp_path / "not-a-directory"
+    blocker.write_text("")
+
+    payslip = load_payslip(pdf_path, cache=PayslipCache(str(blocker)))
+    assert payslip == load_payslip(pdf_path)
+    assert "Could not cache payslip" in caplog.text
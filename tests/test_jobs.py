@@ -0,0 +1,65 @@
+import threading
+import time
+
+from src.io.jobs import JobQueue
+
+def wait_for(queue, job_id, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.status(job_id)
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        time.sleep(0.01)
+    raise TimeoutError(job_id)
+
+def test_job_reports_progress_and_message():
+    queue = JobQueue()
+
+    def run(progress):
+        progress("import", 5, 10)
+        progress("commit", 1, 1)
+        return "done"
+
+    job = wait_for(queue, queue.submit("sync", "a", run)["id"])
+    assert job["status"] == "succeeded"
+    assert job["message"] == "done"
+    assert job["stage"] == "commit"
+    assert job["progress"]["import"] == {"done": 5, "total": 10}
+
+def test_failed_job_keeps_error():
+    queue = JobQueue()
+
+    def run(_progress):
+        raise ValueError("Missing Actual Budget configuration")
+
+    job = wait_for(queue, queue.submit("sync", "a", run)["id"])
+    assert job["status"] == "failed"
+    assert job["error"] == "Missing Actual Budget configuration"
+
+def test_duplicate_submissions_collapse_while_pending():
+    queue = JobQueue()
+    release = threading.Event()
+    calls = []
+
+    def run(_progress):
+        calls.append(1)
+        _ = release.wait(5)
+        return "done"
+
+    first = queue.submit("sync", "same-file", run)
+    second = queue.submit("sync", "same-file", run)
+    other = queue.submit("sync", "other-file", run)
+    assert first["id"] == second["id"]
+    assert other["id"] != first["id"]
+
+    release.set()
+    wait_for(queue, first["id"])
+    wait_for(queue, other["id"])
+    assert len(calls) == 2
+
+    again = queue.submit("sync", "same-file", run)
+    assert again["id"] != first["id"]
+    wait_for(queue, again["id"])
+
+def test_unknown_job():
+    assert JobQueue().status("missing") is None
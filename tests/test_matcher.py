@@ -0,0 +1,22 @@
+from src.core.matcher import KeywordMatcher
+
+def test_search_returns_lowest_priority():
+    matcher = KeywordMatcher([("wolt", 2), ("ol", 1), ("google", 0)])
+    assert matcher.search("wolt delivery") == (1, "ol")
+    assert matcher.search("google wolt") == (0, "google")
+    assert matcher.search("random") is None
+
+def test_search_overlapping_keywords():
+    matcher = KeywordMatcher([("he", 1), ("she", 2), ("hers", 0)])
+    assert matcher.search("ushers") == (0, "hers")
+    assert matcher.search("ushe") == (1, "he")
+
+def test_search_hebrew_keywords():
+    matcher = KeywordMatcher([("קרמה +", 0), ("עיריית", 1)])
+    assert matcher.search("עיריית תל אביב") == (1, "עיריית")
+    assert matcher.search("קרמה + סניף") == (0, "קרמה +")
+
+def test_search_empty_keyword_matches_everything():
+    matcher = KeywordMatcher([("", 3), ("abc", 1)])
+    assert matcher.search("xyz") == (3, "")
+    assert matcher.search("abc") == (1, "abc")
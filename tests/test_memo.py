@@ -0,0 +1,69 @@
+import threading
+
+from src.core.memo import CategoryMemo
+from src.io.filesystem import load_category_memo, save_category_memo
+
+def test_get_or_compute_counts_hits_and_misses():
+    memo = CategoryMemo("hash")
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return "Eating out"
+
+    assert memo.get_or_compute(("wolt", None, 2), compute) == "Eating out"
+    assert memo.get_or_compute(("wolt", None, 2), compute) == "Eating out"
+    assert len(calls) == 1
+    assert memo.stats()["hits"] == 1
+    assert memo.stats()["misses"] == 1
+
+def test_lru_eviction():
+    memo = CategoryMemo("hash", maxsize=2)
+    memo.update([(("a", None, 2), "A"), (("b", None, 2), "B")])
+    memo.get_or_compute(("a", None, 2), lambda: "X")
+    memo.get_or_compute(("c", None, 2), lambda: "C")
+
+    keys = [key for key, _ in memo.entries()]
+    assert keys == [("a", None, 2), ("c", None, 2)]
+
+def test_validate_clears_on_rules_change():
+    memo = CategoryMemo("old")
+    memo.update([(("a", None, 2), "A")])
+    memo.validate("old")
+    assert len(memo) == 1
+    memo.validate("new")
+    assert len(memo) == 0
+    assert memo.rules_hash == "new"
+
+def test_concurrent_access_with_eviction():
+    memo = CategoryMemo("hash", maxsize=8)
+    errors = []
+
+    def worker(offset):
+        try:
+            for i in range(2000):
+                memo.get_or_compute((str((i + offset) % 32), None, 2), lambda: "A")
+                if i % 500 == 0:
+                    memo.validate("hash" if i % 1000 else "other")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert len(memo) <= 8
+
+def test_load_category_memo_survives_corrupt_file(tmp_path):
+    path = tmp_path / "memo.pkl"
+    memo = CategoryMemo("hash")
+    memo.update([(("a", None, 2), "A")])
+    save_category_memo(memo, str(path))
+    assert load_category_memo(str(path), "hash").entries() == [(("a", None, 2), "A")]
+
+    path.write_bytes(path.read_bytes()[:10])
+    assert len(load_category_memo(str(path), "hash")) == 0
+    path.write_bytes(b"\x80\x04\x95\x10\x00\x00\x00\x00\x00\x00\x00\x8c\x04nope\x8c\x03Foo\x93.")
+    assert len(load_category_memo(str(path), "hash")) == 0
@@ -0,0 +1,63 @@
+import os
+
+import pandas as pd
+import pytest
+
+from src.core.excel import run_pipeline
+from src.core.metrics import compute_metrics, metric
+from src.io.filesystem import read_excel
+from tests.generate_mock_excel import generate_mock_excel
+
+GOLDEN_FILE = "tests/data/golden_statement.xlsx"
+
+@pytest.fixture(scope="module")
+def statement_df():
+    if not os.path.exists(GOLDEN_FILE):
+        os.makedirs(os.path.dirname(GOLDEN_FILE), exist_ok=True)
+        generate_mock_excel(GOLDEN_FILE)
+    return run_pipeline(read_excel(GOLDEN_FILE))
+
+def test_metrics_match_pandas(statement_df):
+    metrics = compute_metrics(statement_df)
+    outflows = statement_df[statement_df["Amount"] > 0]
+    spent_by_cat = outflows.groupby("Category", observed=True)["Amount"].sum()
+
+    assert metrics["total_spent"] == pytest.approx(outflows["Amount"].sum())
+    assert metrics["avg_trans"] == pytest.approx(statement_df["Amount"].mean())
+    assert metrics["trans_count"] == len(statement_df)
+    assert metrics["top_category"] == spent_by_cat.idxmax()
+    assert metrics["top_category_amount"] == pytest.approx(spent_by_cat.max())
+    assert metrics["spent_by_category"] == pytest.approx(spent_by_cat.to_dict())
+
+def test_breakdowns_match_pandas(statement_df):
+    metrics = compute_metrics(statement_df, ["spent_by_month", "top_payees"])
+    outflows = statement_df[statement_df["Amount"] > 0]
+    months = pd.to_datetime(outflows["Date"]).dt.strftime("%Y-%m")
+    by_payee = outflows.groupby("Payee")["Amount"].sum().sort_values(ascending=False)
+
+    assert metrics["spent_by_month"] == pytest.approx(outflows.groupby(months)["Amount"].sum().to_dict())
+    assert list(metrics["top_payees"].values()) == pytest.approx(by_payee.head(5).tolist())
+
+def test_category_dtype_matches_object(statement_df):
+    categorical = statement_df.astype({"Payee": "category", "Category": "category"})
+    assert compute_metrics(categorical) == compute_metrics(statement_df)
+
+def test_empty_frame():
+    empty = pd.DataFrame(columns=["Date", "Payee", "Amount", "Category"])
+    metrics = compute_metrics(empty)
+    assert metrics["total_spent"] == 0.0
+    assert metrics["avg_trans"] == 0.0
+    assert metrics["trans_count"] == 0
+    assert metrics["top_category"] == "N/A"
+    assert metrics["top_category_amount"] == 0.0
+    assert metrics["spent_by_category"] == {}
+
+def test_registered_metric_shares_frame(statement_df, monkeypatch):
+    monkeypatch.setattr("src.core.metrics._registry", {})
+
+    @metric("largest_outflow")
+    def largest_outflow(frame):
+        return float(frame.amounts[frame.outflow].max())
+
+    metrics = compute_metrics(statement_df, ["largest_outflow"])
+    assert metrics == {"largest_outflow": pytest.approx(statement_df["Amount"].max())}
@@ -1,6 +1,16 @@
 from datetime import date
 import pytest
-from src.core.pdf import extract_payslip_date, extract_gross_pay, extract_net_pay
+from src.core.pdf import (
+    PAYSLIP_SCANNER,
+    FieldScanner,
+    FieldSpec,
+    PayslipLayout,
+    extract_payslip_date,
+    extract_gross_pay,
+    extract_net_pay,
+    find_fields,
+    parse_amount,
+)
 
 def test_extract_payslip_date():
     text = "תלוש משכורת לחודש\n01/2026"
@@ -25,3 +35,50 @@ def test_extract_net_pay():
 def test_extract_net_pay_invalid():
     with pytest.raises(ValueError):
         extract_net_pay("No net pay here")
+
+def test_find_fields_skips_missing():
+    text = "10,000.00\nהכנסה חייבת\nנטו לבנק8,500.50"
+    assert find_fields(text, ["date", "taxable_income", "net_to_bank"]) == {
+        "taxable_income": 10000.0,
+        "net_to_bank": 8500.5,
+    }
+
+def test_payslip_layout_visits_hinted_pages_first():
+    layout = PayslipLayout()
+    assert layout.page_order(3) == [0, 1, 2]
+
+    layout.learn({"date": 2, "net_to_bank": 1})
+    assert layout.page_order(3) == [1, 2, 0]
+    assert layout.page_order(2) == [1, 0]
+
+def test_scanner_finds_all_fields_in_one_pass():
+    text = (
+        "תלוש משכורת לחודש\n12/2025\n"
+        "10,000.00\nהכנסה חייבת\n"
+        "מס הכנסה 1,200.50\nביטוח לאומי 350.00\nקרן פנסיה 600.00\n"
+        "שעות נוספות 800.00\nנטו לבנק8,500.50"
+    )
+    assert PAYSLIP_SCANNER.scan(text) == {
+        "date": date(2026, 1, 1),
+        "taxable_income": 10000.0,
+        "income_tax": 1200.5,
+        "national_insurance": 350.0,
+        "pension": 600.0,
+        "overtime": 800.0,
+        "net_to_bank": 8500.5,
+    }
+
+def test_scanner_keeps_first_match_and_requested_fields():
+    text = "נטו לבנק1,000.00\nנטו לבנק2,000.00\nמס הכנסה 100.00"
+    assert PAYSLIP_SCANNER.scan(text, ["net_to_bank"]) == {"net_to_bank": 1000.0}
+
+def test_scanner_finds_fields_whose_labels_start_together():
+    scanner = FieldScanner([
+        FieldSpec("gross", r"Gross (\d+)", int),
+        FieldSpec("gross_total", r"Gross \d+ total (\d+)", int),
+    ])
+    assert scanner.scan("Gross 5 total 7") == {"gross": 5, "gross_total": 7}
+
+def test_scanner_skips_matches_that_fail_to_parse():
+    scanner = FieldScanner([FieldSpec("amount", r"Amount ([\d,.]+)", parse_amount)])
+    assert scanner.scan("Amount 1.2.3\nAmount 4.00") == {"amount": 4.0}
@@ -0,0 +1,52 @@
+import pickle
+from src.io.filesystem import load_cached_rules
+from src.core.rules import RuleSet
+
+YAML = "Eating out:\n  - wolt\n  - מסעדות\nEducation & Learning:\n  - udemy\n  - e:hit\n".encode("utf-8")
+
+def test_rule_set_compile():
+    rules = RuleSet.from_yaml(YAML)
+    assert rules.names == ["Eating out", "Education & Learning"]
+    assert rules.matcher.search("wolt delivery") == (0, "wolt")
+    assert rules.exact_index == {"hit": 1}
+    assert rules.bank_index == {"wolt": 0, "מסעדות": 0, "udemy": 1}
+
+def test_rule_set_invalid_yaml():
+    rules = RuleSet.from_yaml(b"- just\n- a list\n")
+    assert rules.categories == {}
+
+def test_load_cached_rules_writes_and_reuses_artifact(tmp_path):
+    yaml_path = tmp_path / "categories.yaml"
+    artifact_path = tmp_path / "categories.rules.pkl"
+    yaml_path.write_bytes(YAML)
+
+    rules = load_cached_rules(str(yaml_path), str(artifact_path))
+    assert artifact_path.exists()
+    with open(artifact_path, "rb") as f:
+        assert pickle.load(f).digest == rules.digest
+
+    assert load_cached_rules(str(yaml_path), str(artifact_path)).digest == rules.digest
+
+def test_load_cached_rules_ignores_stale_artifact(tmp_path):
+    yaml_path = tmp_path / "categories.yaml"
+    artifact_path = tmp_path / "categories.rules.pkl"
+    yaml_path.write_bytes(YAML)
+    stale = load_cached_rules(str(yaml_path), str(artifact_path))
+
+    yaml_path.write_bytes(YAML + b"Telecom:\n  - partner\n")
+    rules = load_cached_rules(str(yaml_path), str(artifact_path))
+    assert rules.digest != stale.digest
+    assert "Telecom" in rules.names
+
+def test_load_cached_rules_rebuilds_corrupt_artifact(tmp_path):
+    yaml_path = tmp_path / "categories.yaml"
+    artifact_path = tmp_path / "cache" / "categories.rules.pkl"
+    yaml_path.write_bytes(YAML)
+    artifact_path.parent.mkdir()
+    artifact_path.write_bytes(b"\x80\x04\x95garbage")
+
+    rules = load_cached_rules(str(yaml_path), str(artifact_path))
+    assert rules.names == ["Eating out", "Education & Learning"]
+    with open(artifact_path, "rb") as f:
+        assert pickle.load(f).digest == rules.digest
+    assert [p.name for p in artifact_path.parent.iterdir()] == ["categories.rules.pkl"]
@@ -181,12 +181,13 @@ async function syncTransactions() {
       method: "POST",
     });
 
-    const result = await response.json();
+    const job = await response.json();
 
     if (!response.ok) {
-      throw new Error(result.detail || "Failed to sync transactions");
+      throw new Error(job.detail || "Failed to sync transactions");
     }
 
+    const result = await waitForJob(job.id, btnSyncTransactions);
     showToast(result.message, "success");
   } catch (error) {
     showToast(error.message, "error");
@@ -210,12 +211,13 @@ async function syncPayslip() {
       }),
     });
 
-    const result = await response.json();
+    const job = await response.json();
 
     if (!response.ok) {
-      throw new Error(result.detail || "Failed to sync payslip");
+      throw new Error(job.detail || "Failed to sync payslip");
     }
 
+    const result = await waitForJob(job.id, btnSyncPayslip);
     showToast(result.message, "success");
   } catch (error) {
     showToast(error.message, "error");
@@ -224,6 +226,33 @@ async function syncPayslip() {
   }
 }
 
+// Poll a background sync job until it finishes, showing its stage on the button
+async function waitForJob(jobId, btnElement, intervalMs = 1000) {
+  const textSpan = btnElement.querySelector(".btn-text");
+
+  while (true) {
+    const response = await fetch(`/api/jobs/${jobId}`);
+    const job = await response.json();
+
+    if (!response.ok) {
+      throw new Error(job.detail || "Failed to fetch sync status");
+    }
+    if (job.status === "succeeded") {
+      return job;
+    }
+    if (job.status === "failed") {
+      throw new Error(`Synchronization failed: ${job.error}`);
+    }
+
+    if (job.stage) {
+      const { done, total } = job.progress[job.stage];
+      const counter = total > 1 ? ` ${done}/${total}` : "";
+      textSpan.textContent = `Syncing (${job.stage}${counter})...`;
+    }
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+}
+
 // UI helper states
 function showPayslipPasswordInput() {
   payslipPasswordSection.classList.remove("hidden");